@@ -25,6 +25,7 @@ from codablellm.core.utils import (
     DynamicSymbol,
 )
 from codablellm.dataset import (
+    SUPPORTED_EXTENSIONS,
     DecompiledCodeDatasetConfig,
     SourceCodeDatasetConfig,
 )
@@ -82,24 +83,7 @@ DEFAULT_MANAGE_CONFIG: Final[ManageConfig] = ManageConfig()
 
 
 def validate_dataset_format(path: Path) -> Path:
-    if path.suffix.casefold() not in [
-        e.casefold()
-        for e in [
-            ".json",
-            ".jsonl",
-            ".csv",
-            ".tsv",
-            ".xlsx",
-            ".xls",
-            ".xlsm",
-            ".md",
-            ".markdown",
-            ".tex",
-            ".html",
-            ".html",
-            ".xml",
-        ]
-    ]:
+    if path.suffix.casefold() not in SUPPORTED_EXTENSIONS:
         raise BadParameter(f'Unsupported dataset format: "{path.suffix}"')
     return path
 
@@ -471,7 +455,7 @@ def command(
         decompile = True
     # Create source code/decompiled code dataset
     if decompile:
-        if not bins or not any(bins):
+        if not bins:
             raise BadParameter(
                 "Must specify at least one binary for decompiled code datasets.",
                 param_hint="bins",
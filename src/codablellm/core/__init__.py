@@ -5,12 +5,18 @@ Core functionality of codablellm.
 from codablellm.core import decompiler, extractor
 from codablellm.core.decompiler import DecompileConfig, Decompiler
 from codablellm.core.extractor import ExtractConfig, Extractor
-from codablellm.core.function import DecompiledFunction, Function, SourceFunction
+from codablellm.core.function import (
+    DecompiledFunction,
+    Function,
+    SourceFunction,
+    WriteBackSession,
+)
 
 __all__ = [
     "Function",
     "SourceFunction",
     "DecompiledFunction",
+    "WriteBackSession",
     "extractor",
     "Extractor",
     "ExtractConfig",
@@ -15,6 +15,8 @@ from typing import (
     Any,
     Dict,
     Final,
+    Iterable,
+    Iterator,
     List,
     Literal,
     Mapping,
@@ -24,7 +26,7 @@ from typing import (
     Type,
 )
 
-from tree_sitter import Node
+from tree_sitter import Node, Query
 
 from codablellm.core.function import DecompiledFunction
 from codablellm.core.utils import (
@@ -36,8 +38,16 @@ from codablellm.core.utils import (
     codablellm_flow,
     codablellm_low_level_task,
     codablellm_task,
+    compile_query,
     dynamic_import,
+    get_max_pending,
+    get_parser,
     is_binary,
+    iter_files,
+    preload_in_workers,
+    register_worker_preload,
+    replace_symbols,
+    submit_bounded,
 )
 from codablellm.languages.c import CExtractor
 
@@ -61,11 +71,17 @@ _decompiler: RegisteredDecompiler = RegisteredDecompiler(
     "Ghidra", BUILTIN_SYMBOLS["Ghidra"]
 )
 
+register_worker_preload(lambda: [_decompiler.symbol])
+
 
 def set(name: str, symbol: DynamicSymbol) -> None:
     """
     Sets the decompiler used by `codablellm`.
 
+    The decompiler class is resolved once per process, and decompile tasks receive the
+    decompiler instance created when the flow starts. Workers therefore never read the
+    registration themselves, so it only needs to be set in the process running the flow.
+
     Parameters:
         name: The display name of the decompiler (e.g., "Ghidra", "Angr").
         symbol: A tuple containing the file path and class name of the decompiler implementation.
@@ -82,6 +98,8 @@ def set(name: str, symbol: DynamicSymbol) -> None:
         logger.error(f"Could not create {repr(name)} extractor")
         _decompiler = old_decompiler
         raise
+    # Workers of an already running cluster would otherwise import it on their first task
+    preload_in_workers(_decompiler.symbol)
     logger.info(f"Using {repr(name)} ({file}::{class_name}) as the decompiler")
 
 
@@ -110,6 +128,11 @@ Tree-sitter query used to extract all C symbols from a function definition.
 """
 
 
+def _get_c_symbols_query() -> Query:
+    # Compiled once and reused for every function that is pseudo-stripped
+    return compile_query(CExtractor.LANGUAGE, GET_C_SYMBOLS_QUERY)
+
+
 def pseudo_strip(
     decompiler: "Decompiler", function: DecompiledFunction
 ) -> "DecompiledFunction":
@@ -133,19 +156,23 @@ def pseudo_strip(
     symbol_mapping: Dict[str, str] = {}
 
     def anonymize_symbol(node: Node) -> str:
-        nonlocal symbol_mapping, assembly
+        nonlocal symbol_mapping
         if not node.text:
             raise ValueError(f"Expected all function.symbols to have text: {node}")
         orig_function = node.text.decode()
-        stripped_symbol = symbol_mapping.setdefault(
-            orig_function, decompiler.get_stripped_function_name(function.address)
-        )
-        assembly = assembly.replace(orig_function, stripped_symbol)
+        stripped_symbol = symbol_mapping.get(orig_function)
+        if stripped_symbol is None:
+            stripped_symbol = decompiler.get_stripped_function_name(function.address)
+            symbol_mapping[orig_function] = stripped_symbol
         return stripped_symbol
 
-    editor = ASTEditor(CExtractor.PARSER, definition)
-    editor.match_and_edit(GET_C_SYMBOLS_QUERY, {"function.symbols": anonymize_symbol})
+    editor = ASTEditor(get_parser(CExtractor.LANGUAGE), definition)
+    editor.match_and_edit(
+        _get_c_symbols_query(), {"function.symbols": anonymize_symbol}
+    )
     definition = editor.source_code
+    # Replace all symbols in a single pass over the assembly once they are all known
+    assembly = replace_symbols(assembly, symbol_mapping)
 
     first_function = next(iter(symbol_mapping.values()), function.name)
 
@@ -165,6 +192,8 @@ class Decompiler(ABC):
     Abstract base class for a decompiler that extracts decompiled functions from compiled binaries.
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def decompile(self, path: PathLike) -> Sequence[DecompiledFunction]:
         """
@@ -323,6 +352,42 @@ def decompile_task(
     return decompiler.decompile(path)
 
 
+def _iter_bins(paths: Iterable[PathLike], recursive: bool = False) -> Iterator[Path]:
+    """
+    Lazily locates the binaries to decompile from the given paths.
+
+    Binaries located through overlapping paths (e.g. a directory and a binary inside it) are
+    only yielded once.
+
+    Parameters:
+        paths: Paths pointing to binary files or directories containing binaries.
+        recursive: If `True`, recursively scan directories for binaries.
+
+    Returns:
+        An iterator of the located binaries.
+    """
+    # Note that the builtin set is shadowed by this module's set()
+    located_bins: Dict[Path, Path] = {}
+    for path in paths:
+        path = Path(path)
+        try:
+            path.mkdir(parents=True, exist_ok=True)
+        except FileExistsError:
+            # In case the path is not a directory, continue
+            pass
+        # If a path is a directory, collect all child binaries
+        if path.is_dir():
+            files = iter_files(path, recursive=recursive)
+            bins: Iterable[Path] = (
+                b for b in (Path(d, n) for d, n in files) if is_binary(b)
+            )
+        else:
+            bins = [path]
+        for bin in bins:
+            if located_bins.setdefault(bin.resolve(), bin) is bin:
+                yield bin
+
+
 @codablellm_task(name="decompile_bins")
 def decompile_bins_task(
     *paths: PathLike, config: DecompileConfig
@@ -338,33 +403,32 @@ def decompile_bins_task(
     Returns:
         Either a list of `DecompiledFunction` instances or a `_CallableDecompiler` for deferred execution.
     """
-    bins: List[Path] = []
-    # Collect binary files
-    for path in paths:
-        path = Path(path)
-        try:
-            path.mkdir(parents=True, exist_ok=True)
-        except FileExistsError:
-            # In case the path is not a directory, continue
-            pass
-        # If a path is a directory, glob all child binaries
-        glob = path.rglob if config.recursive else path.glob
-        bins.extend([b for b in glob("*") if is_binary(b)] if path.is_dir() else [path])
-    if not any(bins):
-        logger.warning("No binaries found to decompile")
     # Create decompiler
     decompiler = create_decompiler(*config.decompiler_args, **config.decompiler_kwargs)
-    # Submit decompile tasks
+    # Decompilation time scales roughly with binary size, so the largest binaries are
+    # submitted first to keep one big binary from becoming a straggler at the end
+    bins = sorted(
+        _iter_bins(paths, recursive=config.recursive),
+        key=lambda b: b.stat().st_size,
+        reverse=True,
+    )
     logger.info(f"Submitting {get().name} decompile tasks...")
-    futures = [
-        decompile_task.submit(decompiler, bin, config.symbol_remover, return_state=True)
-        for bin in bins
-    ]
-    results = [future.result(raise_on_failure=config.strict) for future in futures]
+    # Bind the lookups once rather than per submitted binary
+    submit = decompile_task.submit
+    symbol_remover = config.symbol_remover
+    futures = submit_bounded(
+        lambda bin: submit(decompiler, bin, symbol_remover),
+        bins,
+        get_max_pending(config.max_workers),
+    )
     functions: List[DecompiledFunction] = []
-    for result in results:
+    # Consume results in completion order so a slow binary does not hold up the rest
+    for future in futures:
+        result = future.result(raise_on_failure=config.strict)
         if isinstance(result, list):
             functions.extend(result)
+    if not bins:
+        logger.warning("No binaries found to decompile")
     logger.info(f"Successfully decompiled {len(functions)} functions")
     return functions
 
@@ -4,15 +4,20 @@ Module containing functions for managing and registering source code extractors.
 Source code extractors are responsible for parsing and extracting function definitions from different programming languages.
 """
 
+import itertools
 import logging
+import os
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import (
     Any,
     Callable,
+    Collection,
     Dict,
     Final,
+    Iterable,
+    Iterator,
     List,
     Literal,
     Mapping,
@@ -21,9 +26,12 @@ from typing import (
     OrderedDict,
     Sequence,
     Set,
+    Tuple,
     Type,
 )
 
+from prefect.futures import PrefectFuture
+
 from codablellm.core.function import SourceFunction
 from codablellm.core.utils import (
     DynamicSymbol,
@@ -32,6 +40,11 @@ from codablellm.core.utils import (
     codablellm_low_level_task,
     codablellm_task,
     dynamic_import,
+    get_max_pending,
+    iter_batches,
+    preload_in_workers,
+    register_worker_preload,
+    submit_bounded,
 )
 
 
@@ -90,6 +103,9 @@ def get_registered() -> Sequence[RegisteredExtractor]:
     return list(_EXTRACTORS.values())
 
 
+register_worker_preload(lambda: [e.symbol for e in _EXTRACTORS.values()])
+
+
 def register(
     language: str,
     symbol: DynamicSymbol,
@@ -116,6 +132,8 @@ def register(
         logger.error(f"Could not create {repr(language)} extractor")
         unregister(language)
         raise
+    # Workers of an already running cluster would otherwise import it on their first task
+    preload_in_workers(registered_extractor.symbol)
     logger.info(f"Registered {repr(language)} extractor at {file}::{class_name}")
 
 
@@ -166,15 +184,18 @@ class Extractor(ABC):
         pass
 
     @abstractmethod
-    def get_extractable_files(self, path: PathLike) -> Set[Path]:
+    def get_extractable_files(self, path: PathLike) -> Iterable[Path]:
         """
         Retrieves all files that can be processed by the extractor from the given path.
 
+        The files are only iterated once, so implementations may yield them lazily (e.g. from
+        a generator) rather than collecting them first.
+
         Parameters:
             path: A file or directory path to search for extractable files.
 
         Returns:
-            A sequence of `Path` objects representing extractable source files.
+            An iterable of `Path` objects representing extractable source files.
         """
         pass
 
@@ -197,10 +218,12 @@ def create_extractor(language: str, *args: Any, **kwargs: Any) -> Extractor:
     Raises:
         ExtractorNotFound: If no extractor is registered for the specified language.
     """
-    if language in _EXTRACTORS:
-        extractor_class: Type[Extractor] = dynamic_import(_EXTRACTORS[language].symbol)
-        return extractor_class(*args, **kwargs)
-    raise ValueError(f'"{language}" is not a registered extractor')
+    registered_extractor = _EXTRACTORS.get(language)
+    if registered_extractor is None:
+        raise ValueError(f'"{language}" is not a registered extractor')
+    # dynamic_import caches resolved symbols, so the class is only imported once per process
+    extractor_class: Type[Extractor] = dynamic_import(registered_extractor.symbol)
+    return extractor_class(*args, **kwargs)
 
 
 Transform = Callable[[SourceFunction], SourceFunction]
@@ -259,10 +282,18 @@ class ExtractConfig:
     The values are dictionaries of keyword arguments. For example, `{'C': {'kwarg1': value1}}`.
     """
     strict: bool = False
+    batch_size: int = 8
+    """
+    The number of files extracted by each extraction task, and the number of functions
+    transformed by each transform task. Batching amortizes the per-task scheduling and
+    serialization overhead over many small files and functions.
+    """
 
     def __post_init__(self) -> None:
         if self.max_workers and self.max_workers < 1:
             raise ValueError("Max workers must be a positive integer")
+        if self.batch_size < 1:
+            raise ValueError("Batch size must be a positive integer")
         if self.exclude_subpaths & self.exclusive_subpaths:
             raise ValueError(
                 "Cannot have overlapping paths in exclude_subpaths and "
@@ -276,6 +307,120 @@ class ExtractConfig:
             return dynamic_import(self.transform)
 
 
+def _get_subpath_prefixes(root: Path, subpaths: Collection[Path]) -> Tuple[str, ...]:
+    """
+    Resolves subpaths into string prefixes that can be matched with `str.startswith`.
+
+    Relative subpaths are resolved against `root`. Each prefix ends with a path separator so
+    that a subpath only matches itself and its descendants.
+
+    Parameters:
+        root: The path that relative subpaths are relative to.
+        subpaths: The subpaths to resolve.
+
+    Returns:
+        A tuple of resolved subpath prefixes.
+    """
+    return tuple(os.path.join((root / s).resolve(), "") for s in subpaths)
+
+
+def _iter_extractable_files(
+    path: PathLike, config: ExtractConfig
+) -> Iterator[Tuple[Path, Extractor]]:
+    """
+    Lazily locates the extractable files under a path and the extractor to use for each.
+
+    Files are yielded as soon as an extractor locates them, so extraction can begin before
+    the directory tree has been fully walked.
+
+    Parameters:
+        path: The file or directory path to locate extractable files in.
+        config: Extraction configuration options.
+
+    Returns:
+        An iterator of 2-tuples, where each tuple consists of an extractable file and the
+        extractor to use for it.
+    """
+    root = Path(path)
+    # If exclusive subpaths are specified, only they need to be searched
+    search_paths = [root / s for s in config.exclusive_subpaths] or [root]
+    exclude_prefixes = _get_subpath_prefixes(root, config.exclude_subpaths)
+    # Files share directories, so each directory only needs to be resolved once
+    resolved_dirs: Dict[Path, str] = {}
+    # Maps each located file to the extractor that first located it
+    located_files: Dict[Path, Extractor] = {}
+    for language, _ in get_registered():
+        extractor = create_extractor(
+            language,
+            *config.extractor_args.get(language, []),
+            **config.extractor_kwargs.get(language, {}),
+        )
+        # Locate extractable files lazily, so files are yielded as soon as they are found
+        files = itertools.chain.from_iterable(
+            extractor.get_extractable_files(p) for p in search_paths
+        )
+        if not extractor.is_installed():
+            num_files = sum(1 for _ in files)
+            if num_files:
+                logger.warning(
+                    f"{num_files} {language} files were located, but the built-in {language} "
+                    "extractor is not installed. You can install support for all languages with "
+                    "'pip install codablellm[langs]', or you can install this extra individually."
+                )
+            else:
+                logger.debug(f"No {language} files were located")
+            continue
+        num_files = 0
+        for file in files:
+            num_files += 1
+            # Excluded subpaths take precedence over exclusive subpaths. Appending a
+            # separator lets a subpath prefix match the file itself
+            if exclude_prefixes:
+                resolved_dir = resolved_dirs.get(file.parent)
+                if resolved_dir is None:
+                    resolved_dir = resolved_dirs[file.parent] = str(
+                        file.parent.resolve()
+                    )
+                if os.path.join(resolved_dir, file.name, "").startswith(
+                    exclude_prefixes
+                ):
+                    continue
+            if file in located_files:
+                # Overlapping search paths can locate a file more than once
+                if located_files[file] is not extractor:
+                    logger.info(f"Extractor was already specified for {file.name}")
+                continue
+            located_files[file] = extractor
+            yield file, extractor
+        if not num_files:
+            logger.debug(f"No {language} files were located")
+
+
+def _iter_extraction_batches(
+    path: PathLike, config: ExtractConfig
+) -> Iterator[Tuple[Extractor, List[Path]]]:
+    """
+    Lazily groups the extractable files under a path into batches that share an extractor.
+
+    Each batch only carries its extractor once, rather than once per file, so less needs to
+    be serialized when the batch is submitted.
+
+    Parameters:
+        path: The file or directory path to locate extractable files in.
+        config: Extraction configuration options.
+
+    Returns:
+        An iterator of 2-tuples, where each tuple consists of an extractor and a batch of at
+        most `config.batch_size` files to extract with it.
+    """
+    # Files located by the same extractor are yielded consecutively
+    for extractor, items in itertools.groupby(
+        _iter_extractable_files(path, config), key=lambda item: item[1]
+    ):
+        for files in iter_batches((file for file, _ in items), config.batch_size):
+            yield extractor, files
+
+
 @codablellm_low_level_task(name="extract_file")
 def extract_file_task(
     extractor: Extractor, file: PathLike, repo_path: Optional[PathLike]
@@ -283,6 +428,39 @@ def extract_file_task(
     return extractor.extract(file, repo_path=repo_path)
 
 
+@codablellm_low_level_task(name="extract_files")
+def extract_files_task(
+    extractor: Extractor,
+    files: Sequence[Path],
+    repo_path: Optional[PathLike],
+    strict: bool = False,
+) -> List[SourceFunction]:
+    """
+    Extracts source functions from a batch of files using the same extractor.
+
+    Parameters:
+        extractor: The extractor to use for every file in the batch.
+        files: The files to extract functions from.
+        repo_path: Optional repository root path to calculate relative function scopes.
+        strict: If `True`, a file that fails to extract fails the whole batch. Otherwise, the
+            file is logged and skipped.
+
+    Returns:
+        The source functions extracted from all files in the batch.
+    """
+    functions: List[SourceFunction] = []
+    for file in files:
+        try:
+            functions.extend(extractor.extract(file, repo_path=repo_path))
+        except Exception:
+            if strict:
+                raise
+            logger.warning(
+                f"Could not extract functions from {file.name}", exc_info=True
+            )
+    return functions
+
+
 @codablellm_low_level_task(name="apply_transform")
 def apply_transform_task(
     transform: DynamicSymbol, source: SourceFunction
@@ -291,6 +469,58 @@ def apply_transform_task(
     return transform_func(source)
 
 
+@codablellm_low_level_task(name="apply_transforms")
+def apply_transforms_task(
+    transform: DynamicSymbol, sources: Sequence[SourceFunction]
+) -> List[SourceFunction]:
+    """
+    Applies a transform to a batch of source functions.
+
+    Parameters:
+        transform: The dynamic symbol of the transform to apply.
+        sources: The source functions to transform.
+
+    Returns:
+        The transformed source functions, in the same order as `sources`.
+    """
+    transform_func: Transform = dynamic_import(transform)
+    return [transform_func(source) for source in sources]
+
+
+def transform_functions(
+    functions: Iterable[SourceFunction], config: ExtractConfig
+) -> List[SourceFunction]:
+    """
+    Applies the transform of an extraction configuration to source functions.
+
+    The functions are transformed in batches of `config.batch_size`, with a bounded number of
+    transform tasks in flight, rather than holding a future for every function until all of
+    them are done.
+
+    Parameters:
+        functions: The source functions to transform.
+        config: Extraction configuration options, which must specify a transform.
+
+    Returns:
+        The transformed source functions.
+
+    Raises:
+        ValueError: If `config` does not specify a transform.
+    """
+    transform = config.transform
+    if not transform:
+        raise ValueError("Extract config does not specify a transform")
+    futures = submit_bounded(
+        lambda batch: apply_transforms_task.submit(transform, batch),
+        iter_batches(functions, config.batch_size),
+        get_max_pending(config.max_workers),
+    )
+    transformed_functions: List[SourceFunction] = []
+    for future in futures:
+        transformed_functions.extend(future.result())
+    return transformed_functions
+
+
 @codablellm_task(name="extract_directory")
 def extract_directory_task(
     path: PathLike, config: ExtractConfig = ExtractConfig()
@@ -309,47 +539,38 @@ def extract_directory_task(
     Returns:
         Either a list of extracted `SourceFunction` instances or a `_CallableExtractor` for deferred execution.
     """
-    # Collect extractable files
-    logger.info("Collecting extractable source code files...")
-    file_extractor_map: Dict[Path, Extractor] = {}
-    for language, _ in get_registered():
-        extractor = create_extractor(
-            language,
-            *config.extractor_args.get(language, []),
-            **config.extractor_kwargs.get(language, {}),
-        )
-        # Locate extractable files
-        files = extractor.get_extractable_files(path)
-        if not any(files):
-            logger.debug(f"No {language} files were located")
-        elif not extractor.is_installed():
-            logger.warning(
-                f"{len(files)} {language} files were located, but the built-in {language} "
-                "extractor is not installed. You can install support for all languages with "
-                "'pip install codablellm[langs]', or you can install this extra individually."
-            )
-        else:
-            for file in files:
-                if file_extractor_map.setdefault(file, extractor) != extractor:
-                    logger.info(f"Extractor was already specified for {file.name}")
-    if not any(file_extractor_map):
-        logger.warning("No source code files found to extract")
-    # Submit extraction tasks
-    logger.info("Submitting extraction tasks...")
-    futures = [
-        extract_file_task.submit(extractor, file, repo_path=path)
-        for file, extractor in file_extractor_map.items()
-    ]
-    results = [future.result(raise_on_failure=config.strict) for future in futures]
+    # Extraction tasks are submitted as files are located, rather than after every
+    # extractor has finished collecting its files
+    logger.info("Collecting and submitting extraction tasks...")
+    num_files = 0
+
+    def submit(
+        batch: Tuple[Extractor, List[Path]],
+    ) -> PrefectFuture[List[SourceFunction]]:
+        nonlocal num_files
+        extractor, files = batch
+        num_files += len(files)
+        return extract_files_task.submit(extractor, files, path, strict=config.strict)
+
+    futures = submit_bounded(
+        submit,
+        _iter_extraction_batches(path, config),
+        get_max_pending(config.max_workers),
+    )
     functions: List[SourceFunction] = []
-    for result in results:
+    # Consume results in completion order so a slow batch does not hold up the rest
+    for future in futures:
+        result = future.result(raise_on_failure=config.strict)
         if isinstance(result, list):
             functions.extend(result)
-    transform = config.get_transform()
-    if transform:
+    if not num_files:
+        logger.warning("No source code files found to extract")
+    # The transform is only imported by the tasks that apply it, so checking the config is
+    # enough to pick the branch once for all functions
+    if config.transform:
         # Apply transformation
         logger.info("Applying transformation...")
-        functions = apply_transform_task.map(functions).result()
+        functions = transform_functions(functions, config)
     logger.info(f"Successfully extracted {len(functions)} functions")
     return functions
 
@@ -359,4 +580,4 @@ def extract(
     *paths: PathLike, config: ExtractConfig = ExtractConfig()
 ) -> List[SourceFunction]:
     futures = [extract_directory_task.submit(path, config=config) for path in paths]
-    return [function for future in futures for function in future.result()]
+    return list(itertools.chain.from_iterable(future.result() for future in futures))
@@ -2,21 +2,85 @@
 Classes pertaining to functions used in code datasets.
 """
 
+import hashlib
 import logging
-import uuid
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass, field
+from functools import cache
 from pathlib import Path
-from typing import Any, Dict, Final, Mapping, Optional, TypedDict, no_type_check
+from types import MappingProxyType
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Final,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    TypedDict,
+    no_type_check,
+)
 
-import tree_sitter_c as tsc
 from deprecated import deprecated
-from tree_sitter import Language, Node, Parser
-
-from codablellm.core.utils import ASTEditor, JSONObject, SupportsJSON
+from tree_sitter import Language, Node, Parser, Query
+
+from codablellm.core.utils import (
+    ASTEditor,
+    JSONObject,
+    SupportsJSON,
+    compile_query,
+    get_max_pending,
+    get_parser,
+    iter_batches,
+    replace_symbols,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _write_back_definition(
+    path: Path, start_byte: int, old_definition: str, new_definition: str
+) -> None:
+    # Only the modified definition and the code after it are rewritten, rather than reading
+    # and rewriting the entire file
+    old_code = old_definition.encode()
+    with path.open("r+b") as file:
+        file.seek(start_byte)
+        if file.read(len(old_code)) == old_code:
+            offset = start_byte
+            tail = file.read()
+        else:
+            # The definition moved, e.g. when an earlier definition in the file was rewritten.
+            # Use the occurrence closest to where it was extracted, so an identical
+            # definition elsewhere in the file is left untouched
+            file.seek(0)
+            source_code = file.read()
+            candidates = [
+                o
+                for o in (
+                    source_code.rfind(old_code, 0, start_byte + len(old_code)),
+                    source_code.find(old_code, start_byte),
+                )
+                if o != -1
+            ]
+            if not candidates:
+                logger.warning(
+                    f"Could not locate the definition to write back in {path.name}"
+                )
+                return
+            offset = min(candidates, key=lambda o: abs(o - start_byte))
+            tail = source_code[offset + len(old_code) :]
+        file.seek(offset)
+        file.write(new_definition.encode())
+        file.write(tail)
+        file.truncate()
+
+
 class FunctionJSONObject(TypedDict):
     uid: str
     path: str
@@ -25,7 +89,7 @@ class FunctionJSONObject(TypedDict):
     metadata: Dict[str, Any]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Function(SupportsJSON):
     """
     Base class for functions used in datasets.
@@ -53,6 +117,11 @@ class Function(SupportsJSON):
         if not self.path.is_absolute():
             raise ValueError("Path to source code file must be absolute.")
 
+    def __hash__(self) -> int:
+        # The UID identifies the function, so there is no need to hash its definition and
+        # metadata, which are potentially large and not hashable, respectively
+        return hash(self.uid)
+
     @property
     def metadata(self) -> Mapping[str, Any]:
         """
@@ -61,7 +130,8 @@ class Function(SupportsJSON):
         Returns:
             A mapping containing the metadata associated with the function.
         """
-        return {k: v for k, v in self._metadata.items()}
+        # A proxy avoids copying the metadata every time it is accessed
+        return MappingProxyType(self._metadata)
 
     @staticmethod
     def create_uid(file_path: Path, name: str, repo_path: Optional[Path] = None) -> str:
@@ -84,16 +154,23 @@ class Function(SupportsJSON):
             ValueError: If the given `file_path` is not a subpath of `repo_path`.
         """
         if repo_path:
-            try:
-                relative_file_path = repo_path.name / file_path.resolve().relative_to(
-                    repo_path.resolve()
+            # Compare resolved paths as strings rather than raising and catching a ValueError
+            # from Path.relative_to for every function
+            resolved_file_path = os.path.realpath(file_path)
+            resolved_repo_path = os.path.realpath(repo_path)
+            if resolved_file_path == resolved_repo_path:
+                # A single file is being extracted, so it is its own repository
+                scope = repo_path.name
+            elif resolved_file_path.startswith(os.path.join(resolved_repo_path, "")):
+                relative_file_path = resolved_file_path[len(resolved_repo_path) :]
+                scope = "::".join(
+                    (repo_path.name, *relative_file_path.strip(os.sep).split(os.sep))
                 )
-                scope = "::".join(relative_file_path.parts)
-            except ValueError as e:
+            else:
                 raise ValueError(
                     f'Path to "{file_path.name}" is not in the '
                     f'"{repo_path.name}" repository.'
-                ) from e
+                )
         else:
             scope = file_path.parts[-1]
         return f"{scope}::{name}"
@@ -109,7 +186,8 @@ class Function(SupportsJSON):
         Returns:
             The function name.
         """
-        return uid.split("::")[-1]
+        # Only the last scope is needed, so avoid splitting the whole UID
+        return uid.rpartition("::")[2]
 
     def to_json(self) -> FunctionJSONObject:
         return {
@@ -132,6 +210,79 @@ class Function(SupportsJSON):
         return function
 
 
+class WriteBackSession:
+    """
+    Batches the definitions written back to source files by `SourceFunction.with_definition`.
+
+    Each source file is read once and written once when the session is flushed, rather than
+    being read and rewritten for every modified function.
+
+    Example:
+        ```py
+        with WriteBackSession() as session:
+            for function in functions:
+                function.with_definition(transform(function.definition), session=session)
+        ```
+    """
+
+    def __init__(self) -> None:
+        # Maps each file to its pending edits, keyed by the start byte of the definition
+        self._edits: Dict[Path, Dict[int, Tuple[bytes, bytes]]] = {}
+
+    def __enter__(self) -> "WriteBackSession":
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        # Only write back the modified source code if all edits succeeded
+        if exc_type is None:
+            self.flush()
+
+    def replace(self, path: Path, start_byte: int, old: str, new: str) -> None:
+        """
+        Replaces a definition in the pending source code of a file.
+
+        Parameters:
+            path: The source code file containing the definition.
+            start_byte: The starting byte offset of the definition in the file.
+            old: The definition to replace.
+            new: The new definition.
+        """
+        edits = self._edits.setdefault(path, {})
+        old_code = old.encode()
+        pending_edit = edits.get(start_byte)
+        if pending_edit and pending_edit[1] == old_code:
+            # The definition was already modified in this session, so the original
+            # definition is still the one in the file
+            old_code = pending_edit[0]
+        edits[start_byte] = (old_code, new.encode())
+
+    def flush(self) -> None:
+        """
+        Writes the pending source code of all modified files back to disk.
+
+        Each definition is replaced at the byte span it was extracted from, so identical
+        definitions elsewhere in the file are left untouched.
+        """
+        for path, edits in self._edits.items():
+            source_code = bytearray(path.read_bytes())
+            # Edits are applied from the end of the file, so the offsets of the remaining
+            # edits are not shifted by the ones already applied
+            end = len(source_code)
+            for start_byte in sorted(edits, reverse=True):
+                old_code, new_code = edits[start_byte]
+                end_byte = start_byte + len(old_code)
+                if end_byte > end or source_code[start_byte:end_byte] != old_code:
+                    logger.warning(
+                        f"Could not locate the definition at byte {start_byte} of "
+                        f"{path.name}, skipping its write back"
+                    )
+                    continue
+                source_code[start_byte:end_byte] = new_code
+                end = start_byte
+            path.write_bytes(source_code)
+        self._edits.clear()
+
+
 class SourceFunctionJSONObject(FunctionJSONObject):
     language: str
     start_byte: int
@@ -139,7 +290,7 @@ class SourceFunctionJSONObject(FunctionJSONObject):
     class_name: Optional[str]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SourceFunction(Function):
     """
     A subroutine extracted from source code.
@@ -162,6 +313,9 @@ class SourceFunction(Function):
     The name of the class containing the function, if applicable.
     """
 
+    # Declared explicitly, since dataclass would otherwise generate a hash of all fields
+    __hash__ = Function.__hash__
+
     def __post_init__(self) -> None:
         if self.start_byte < 0:
             raise ValueError("Start byte must be a non-negative integer")
@@ -184,6 +338,7 @@ class SourceFunction(Function):
         name: Optional[str] = None,
         write_back: bool = True,
         metadata: Mapping[str, Any] = {},
+        session: Optional[WriteBackSession] = None,
     ) -> "SourceFunction":
         """
         Creates a new `SourceFunction` instance with an updated definition and optional new name.
@@ -196,6 +351,8 @@ class SourceFunction(Function):
             name: Optional new function name. If not provided, retains the current function name and UID.
             write_back: If `True`, writes the updated definition to the original source file.
             metadata: Additional metadata to merge with the existing function metadata.
+            session: Optional `WriteBackSession` to batch the write back with other functions
+                in the same file. If not provided, the file is rewritten immediately.
 
         Returns:
             A new `SourceFunction` instance with the updated definition and metadata.
@@ -219,17 +376,23 @@ class SourceFunction(Function):
             _metadata={**metadata, **self.metadata},
         )
         if write_back:
-            logger.debug(
-                "Writing back modified definition to " f"{source_function.path.name}..."
-            )
-            modified_code = source_function.path.read_text().replace(
-                self.definition, definition
-            )
-            source_function.path.write_text(modified_code)
+            if session:
+                session.replace(
+                    source_function.path, self.start_byte, self.definition, definition
+                )
+            else:
+                logger.debug(
+                    "Writing back modified definition to "
+                    f"{source_function.path.name}..."
+                )
+                _write_back_definition(
+                    source_function.path, self.start_byte, self.definition, definition
+                )
         return source_function
 
     def to_json(self) -> SourceFunctionJSONObject:
-        function_json = super().to_json()
+        # Zero-argument super() cannot be used since slots=True recreates the class
+        function_json = Function.to_json(self)
         return {
             "language": self.language,
             "start_byte": self.start_byte,
@@ -260,11 +423,11 @@ class SourceFunction(Function):
         Returns:
             A UID string in the format: `<relative_path_or_filename>::<class_name>::<function_name>` if `class_name` is provided, otherwise `<relative_path_or_filename>::<function_name>`.
         """
-        uid = Function.create_uid(file_path, name, repo_path=repo_path)
+        # Scope the function name by its class up front, rather than splitting the UID apart
+        # to insert the class name afterwards
         if class_name:
-            scope, function = uid.rsplit("::", maxsplit=1)
-            uid = f"{scope}::{class_name}::{function}"
-        return uid
+            name = f"{class_name}::{name}"
+        return Function.create_uid(file_path, name, repo_path=repo_path)
 
     @staticmethod
     def get_function_name(uid: str) -> str:
@@ -277,7 +440,8 @@ class SourceFunction(Function):
         Returns:
             The function name.
         """
-        return Function.get_function_name(uid).rsplit("::", maxsplit=1)[-1]
+        # The class name is a separate scope of the UID, so the last scope is the function name
+        return Function.get_function_name(uid)
 
     @classmethod
     def from_json(cls, json_obj: SourceFunctionJSONObject) -> "SourceFunction":
@@ -360,13 +524,50 @@ GET_C_SYMBOLS_QUERY: Final[str] = (
 Tree-sitter query used to extract all C symbols from a function definition.
 """
 
-C_PARSER: Final[Parser] = Parser(Language(tsc.language()))
-"""
-Tree-sitter parser for C code.
-"""
 
+@cache
+def _get_c_language() -> Language:
+    # The C grammar is only loaded the first time it is needed, so importing this module
+    # does not load the native tree_sitter_c extension
+    import tree_sitter_c as tsc
 
-@dataclass(frozen=True)
+    return Language(tsc.language())
+
+
+def get_c_parser() -> Parser:
+    """
+    Returns the tree-sitter parser for C code.
+
+    Each thread has its own parser, since a parser cannot be shared between threads that
+    strip functions concurrently.
+
+    Returns:
+        A tree-sitter parser for C code.
+    """
+    return get_parser(_get_c_language())
+
+
+def get_c_symbols_query() -> Query:
+    """
+    Returns the compiled `GET_C_SYMBOLS_QUERY` for the C parser.
+
+    Returns:
+        The compiled tree-sitter query, which is only compiled the first time it is needed.
+    """
+    return compile_query(_get_c_language(), GET_C_SYMBOLS_QUERY)
+
+
+def _hash_symbol(key: str) -> str:
+    return hashlib.blake2b(key.encode(), digest_size=4).hexdigest()
+
+
+def _strip_all(functions: List["DecompiledFunction"]) -> List["DecompiledFunction"]:
+    # A module-level function can be pickled for worker processes, unlike the deprecated
+    # to_stripped wrapper
+    return [function.to_stripped() for function in functions]
+
+
+@dataclass(frozen=True, slots=True)
 class DecompiledFunction(Function):
     """
     A decompiled function extracted from a compiled binary file.
@@ -385,6 +586,8 @@ class DecompiledFunction(Function):
     The starting address of the function in the binary file.
     """
 
+    __hash__ = Function.__hash__
+
     @deprecated(
         reason="Use DecompileConfig.strip when creating datasets", version="1.2.0"
     )
@@ -393,9 +596,10 @@ class DecompiledFunction(Function):
         Creates a stripped version of the decompiled function with anonymized symbol names.
 
         This method replaces all function symbols in both the function definition and assembly code
-        with generated placeholders (e.g., `sub_<uuid>`), ensuring sensitive or original identifiers
+        with generated placeholders (e.g., `sub_<hex>`), ensuring sensitive or original identifiers
         are removed. The resulting `DecompiledFunction` has an updated definition, stripped function name,
-        and modified assembly code.
+        and modified assembly code. The placeholders are derived from the function's UID, so stripping
+        the same function always gives the same names.
 
         Returns:
             A new `DecompiledFunction` instance with stripped symbols and updated assembly.
@@ -403,39 +607,98 @@ class DecompiledFunction(Function):
         definition = self.definition
         assembly = self.assembly
         symbol_mapping: Dict[str, str] = {}
+        stripped_symbols: Set[str] = set()
 
         def strip(node: Node) -> str:
-            nonlocal symbol_mapping, assembly
+            nonlocal symbol_mapping
             if not node.text:
                 raise ValueError(
                     "Expected all function.symbols to have " f"text: {node}"
                 )
             orig_function = node.text.decode()
-            stripped_symbol = symbol_mapping.setdefault(
-                orig_function, f'sub_{str(uuid.uuid4()).split("-", maxsplit=1)[0]}'
-            )
-            assembly = assembly.replace(orig_function, stripped_symbol)
+            stripped_symbol = symbol_mapping.get(orig_function)
+            if stripped_symbol is None:
+                # Stripped names are derived from the UID of the function and the symbol, so
+                # stripping gives the same names in any process, but different names in
+                # different functions. A hash collision within the function is resolved by
+                # hashing again with a salt
+                salt = 0
+                while True:
+                    stripped_symbol = "sub_" + _hash_symbol(
+                        f"{self.uid}::{orig_function}::{salt}"
+                    )
+                    if stripped_symbol not in stripped_symbols:
+                        break
+                    salt += 1
+                symbol_mapping[orig_function] = stripped_symbol
+                stripped_symbols.add(stripped_symbol)
             return stripped_symbol
 
-        editor = ASTEditor(C_PARSER, definition)
+        editor = ASTEditor(get_c_parser(), definition)
         logger.info(f"Stripping {self.name}...")
-        editor.match_and_edit(GET_C_SYMBOLS_QUERY, {"function.symbols": strip})
+        editor.match_and_edit(get_c_symbols_query(), {"function.symbols": strip})
         definition = editor.source_code
+        assembly = replace_symbols(assembly, symbol_mapping)
         first_function, *_ = (
             f for f in symbol_mapping.values() if f.startswith("sub_")
         )
         return DecompiledFunction(
             self.uid,
             self.path,
-            definition,
             first_function,
+            definition,
             assembly,
             self.architecture,
             self.address,
         )
 
+    @classmethod
+    @deprecated(
+        reason="Use DecompileConfig.strip when creating datasets", version="1.2.0"
+    )
+    def strip_batch(
+        cls,
+        functions: Iterable["DecompiledFunction"],
+        max_workers: Optional[int] = None,
+    ) -> List["DecompiledFunction"]:
+        """
+        Creates stripped versions of many decompiled functions in parallel.
+
+        Stripping is CPU-bound, so the functions are stripped with `to_stripped` in a pool of
+        worker processes, each of which uses its own tree-sitter parser.
+
+        Parameters:
+            functions: The decompiled functions to strip.
+            max_workers: The maximum number of worker processes. Defaults to the number of CPUs.
+
+        Returns:
+            The stripped functions, in the same order as `functions`.
+        """
+        functions = list(functions)
+        if len(functions) < 2:
+            # Not worth the cost of starting worker processes
+            return [f.to_stripped() for f in functions]
+        max_workers = max_workers or os.cpu_count() or 1
+        # Send the functions to the workers in chunks to reduce pickling round trips
+        chunksize = max(1, len(functions) // (max_workers * 4))
+        # Executor.map would submit every chunk up front, keeping all of their pickled
+        # arguments in the executor until a worker picks them up, so only a bounded number of
+        # chunks are submitted at once
+        max_pending = get_max_pending(max_workers)
+        pending: Deque[Future[List[DecompiledFunction]]] = deque()
+        stripped_functions: List[DecompiledFunction] = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for chunk in iter_batches(functions, chunksize):
+                if len(pending) >= max_pending:
+                    stripped_functions.extend(pending.popleft().result())
+                pending.append(executor.submit(_strip_all, chunk))
+            while pending:
+                stripped_functions.extend(pending.popleft().result())
+        return stripped_functions
+
     def to_json(self) -> DecompiledFunctionJSONObject:
-        function_json = super().to_json()
+        # Zero-argument super() cannot be used since slots=True recreates the class
+        function_json = Function.to_json(self)
         return {
             "assembly": self.assembly,
             "architecture": self.architecture,
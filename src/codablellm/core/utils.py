@@ -2,18 +2,22 @@
 Core utility functions for codablellm.
 """
 
+import atexit
 import importlib
+import itertools
 import json
 import logging
 import os
+import re
 import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 from contextlib import AbstractContextManager, contextmanager, nullcontext
-from functools import partial, wraps
+from functools import cache, lru_cache, partial, wraps
 from pathlib import Path
-from queue import Queue
+from queue import Empty, Queue, SimpleQueue
 from typing import (
     Any,
     Callable,
@@ -37,16 +41,22 @@ from typing import (
     overload,
 )
 
+from distributed import Client, LocalCluster, WorkerPlugin
 from prefect import Flow, State, Task, flow, task
+from prefect.cache_policies import NONE
 from prefect.client.schemas.objects import TaskRun
+from prefect.futures import PrefectFuture
 from prefect.task_runners import ThreadPoolTaskRunner
 from prefect_dask.task_runners import DaskTaskRunner
-from rich import print
-from rich.prompt import Prompt
-from tree_sitter import Node, Parser, Query, QueryCursor
+from tree_sitter import Language, Node, Parser, Query, QueryCursor
 
 from codablellm.exceptions import ExtraNotInstalled, TSParsingError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 PathLike = Union[Path, str]
@@ -73,6 +83,9 @@ class SupportsJSON(Protocol):
     A class that supports JSON serialization/deserialization.
     """
 
+    # Lets slotted implementations avoid a per-instance __dict__
+    __slots__ = ()
+
     def to_json(self) -> JSONObject_T:  # type: ignore
         """
         Serializes this object to a JSON object.
@@ -96,6 +109,12 @@ class SupportsJSON(Protocol):
         ...
 
 
+FILE_SIZE_UNITS: Final[Tuple[str, ...]] = ("KB", "MB", "GB", "TB")
+"""
+Units used by `get_readable_file_size`, in increasing powers of 1024.
+"""
+
+
 def get_readable_file_size(size: int) -> str:
     """
     Converts number of bytes to a human readable output (i.e. bytes, KB, MB, GB, TB.)
@@ -106,15 +125,11 @@ def get_readable_file_size(size: int) -> str:
     Returns:
         A human readable output of the number of bytes.
     """
-    kb = round(size / 2**10, 3)
-    mb = round(size / 2**20, 3)
-    gb = round(size / 2**30, 3)
-    tb = round(size / 2**40, 3)
-
-    for measurement, suffix in [(tb, "TB"), (gb, "GB"), (mb, "MB"), (kb, "KB")]:
-        if measurement >= 1:
-            return f"{measurement} {suffix}"
-    return f"{size} bytes"
+    # Pick the unit from the bit length of the size, so only one division is needed
+    unit = min((size.bit_length() - 1) // 10, len(FILE_SIZE_UNITS)) if size else 0
+    if not unit:
+        return f"{size} bytes"
+    return f"{round(size / (1 << (unit * 10)), 3)} {FILE_SIZE_UNITS[unit - 1]}"
 
 
 def is_binary(file_path: PathLike) -> bool:
@@ -127,13 +142,49 @@ def is_binary(file_path: PathLike) -> bool:
     Returns:
         True if the file is a binary.
     """
-    file_path = Path(file_path)
-    if file_path.is_file():
-        with open(file_path, "rb") as file:
-            # Read the first 1KB of the file and check for a null byte or non-printable characters
-            chunk = file.read(1024)
-            return b"\0" in chunk or any(byte > 127 for byte in chunk)
-    return False
+    # Open the path directly rather than allocating a Path and calling stat() for every
+    # candidate file. Non-blocking mode keeps FIFOs from blocking the open and the read, and
+    # anything that cannot be read as a file is not a binary
+    flags = os.O_RDONLY | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_NONBLOCK", 0)
+    try:
+        fd = os.open(file_path, flags)
+    except OSError:
+        return False
+    try:
+        # Read the first 1KB of the file without the overhead of a buffered file object
+        chunk = os.read(fd, 1024)
+    except OSError:
+        # Raised when the path is a directory
+        return False
+    finally:
+        os.close(fd)
+    # Check for a null byte or non-ASCII bytes, both of which are checked in C rather than by
+    # iterating over each byte in Python
+    return b"\0" in chunk or not chunk.isascii()
+
+
+def iter_files(
+    root: PathLike, recursive: bool = True
+) -> Generator[Tuple[str, str], None, None]:
+    """
+    Lazily iterates over the files in a directory using `os.walk`.
+
+    Only the directory path and file name strings are yielded, so callers can filter files
+    by name before constructing `Path` objects. Symbolic links to directories are not followed.
+
+    Parameters:
+        root: The directory to iterate over.
+        recursive: If `True`, also iterates over the files in all subdirectories.
+
+    Returns:
+        A generator that yields 2-tuples, where each tuple consists of the directory path and
+        the name of a file in that directory.
+    """
+    for dirpath, _, filenames in os.walk(root, followlinks=False):
+        for name in filenames:
+            yield dirpath, name
+        if not recursive:
+            break
 
 
 def resolve_kwargs(**kwargs: Any) -> Dict[str, Any]:
@@ -151,6 +202,49 @@ def resolve_kwargs(**kwargs: Any) -> Dict[str, Any]:
     return {k: v for k, v in kwargs.items() if v is not None}
 
 
+@lru_cache(maxsize=128)
+def compile_query(language: Language, query: str) -> Query:
+    """
+    Compiles a Tree-sitter query, reusing previously compiled queries.
+
+    Compiling a query is far more expensive than running it, so each query is only compiled
+    once per language and process.
+
+    Parameters:
+        language: The language to compile the query for.
+        query: The Tree-sitter query string.
+
+    Returns:
+        The compiled query.
+    """
+    return Query(language, query)
+
+
+_parsers = threading.local()
+
+
+def get_parser(language: Language) -> Parser:
+    """
+    Returns a Tree-sitter parser for a language that is local to the current thread.
+
+    A `Parser` is not safe to share between threads, so each thread lazily creates and reuses
+    its own parser per language rather than creating a new parser for every file.
+
+    Parameters:
+        language: The Tree-sitter language to parse.
+
+    Returns:
+        The current thread's parser for the language.
+    """
+    parsers: Optional[Dict[Language, Parser]] = getattr(_parsers, "parsers", None)
+    if parsers is None:
+        parsers = _parsers.parsers = {}
+    parser = parsers.get(language)
+    if parser is None:
+        parser = parsers[language] = Parser(language)
+    return parser
+
+
 class ASTEditor:
     """
     A Tree-sitter AST editor.
@@ -168,9 +262,25 @@ class ASTEditor:
             ensure_parsable: If `True`, raises an error if edits result in an invalid AST.
         """
         self.parser = parser
-        self.source_code = source_code
-        self.ast = self.parser.parse(source_code.encode())
+        # Edits are spliced into a byte buffer in place, rather than copying the whole source
+        # code for every edit
+        self._buffer = bytearray(source_code.encode())
+        self._source_code: Optional[str] = source_code
+        self.ast = self.parser.parse(bytes(self._buffer))
         self.ensure_parsable = ensure_parsable
+        self._has_pending_edits = False
+
+    @property
+    def source_code(self) -> str:
+        """
+        The edited source code.
+
+        Returns:
+            The source code, which is only decoded again after it has been edited.
+        """
+        if self._source_code is None:
+            self._source_code = self._buffer.decode()
+        return self._source_code
 
     def edit_code(self, node: Node, new_code: str) -> None:
         """
@@ -183,16 +293,25 @@ class ASTEditor:
         Raises:
             TSParsingError: If `ensure_parsable` is `True` and the resulting AST has parsing errors.
         """
+        self._record_edit(node, new_code)
+        self.flush()
+
+    def _record_edit(self, node: Node, new_code: str) -> None:
+        # Updates the source code and the AST edit descriptors without re-parsing, so that
+        # several edits can share a single incremental re-parse in flush()
+        new_code_bytes = new_code.encode()
         # Calculate new code metrics
-        num_bytes = len(new_code)
-        num_lines = new_code.count("\n")
-        last_col_num_bytes = len(new_code.splitlines()[-1])
+        num_bytes = len(new_code_bytes)
+        num_lines = new_code_bytes.count(b"\n")
+        # Find the last line with rfind rather than splitting the new code into lines
+        last_newline = new_code_bytes.rfind(b"\n")
+        if last_newline < 0:
+            new_end_column = node.start_point.column + num_bytes
+        else:
+            new_end_column = num_bytes - last_newline - 1
         # Update the source code with the new code
-        self.source_code = (
-            self.source_code[: node.start_byte]
-            + new_code
-            + self.source_code[node.end_byte :]
-        )
+        self._buffer[node.start_byte : node.end_byte] = new_code_bytes
+        self._source_code = None
         # Perform the AST edit
         self.ast.edit(
             start_byte=node.start_byte,
@@ -202,18 +321,31 @@ class ASTEditor:
             old_end_point=node.end_point,
             new_end_point=(
                 node.start_point.row + num_lines,
-                node.start_point.column + last_col_num_bytes,
+                new_end_column,
             ),
         )
-        # Re-parse the updated source code
-        self.ast = self.parser.parse(self.source_code.encode(), old_tree=self.ast)
+        self._has_pending_edits = True
+
+    def flush(self) -> None:
+        """
+        Re-parses the source code once for all edits made since the last re-parse.
+
+        The AST is re-parsed incrementally, reusing the unchanged parts of the previous tree.
+
+        Raises:
+            TSParsingError: If `ensure_parsable` is `True` and the resulting AST has parsing errors.
+        """
+        if not self._has_pending_edits:
+            return
+        self.ast = self.parser.parse(bytes(self._buffer), old_tree=self.ast)
+        self._has_pending_edits = False
         # Check for parsing errors if required
         if self.ensure_parsable and self.ast.root_node.has_error:
             raise TSParsingError("Parsing error while editing code")
 
     def match_and_edit(
         self,
-        query: str,
+        query: Union[str, Query, Sequence[str]],
         groups_and_replacement: Dict[str, Union[str, Callable[[Node], str]]],
     ) -> None:
         """
@@ -223,32 +355,78 @@ class ASTEditor:
         result of a callable that returns the replacement string.
 
         Parameters:
-            query: The Tree-sitter query string to use for finding matching nodes.
+            query: The Tree-sitter query, query string, or sequence of query strings to use for
+                finding matching nodes. A sequence of query strings is merged into a single
+                query, so the AST is only traversed once for all of them. Query strings are
+                compiled once and cached with `compile_query`.
             groups_and_replacement: A mapping from query group names to either replacement strings
                                     or callables that take a `Node` and return a replacement string.
 
         Raises:
             TSParsingError: If an edit introduces parsing errors and `ensure_parsable` is `True`.
         """
-        modified_nodes: Set[Node] = set()
-        query_obj = Query(self.ast.language, query)
-        query_cursor = QueryCursor(query_obj)
-        matches = query_cursor.matches(self.ast.root_node)
-        for idx in range(len(matches)):
-            _, capture = matches.pop(idx)
-            for group, replacement in groups_and_replacement.items():
-                nodes = capture.get(group)
-                if nodes:
-                    node = nodes.pop()
-                    if node not in modified_nodes:
-                        if not isinstance(replacement, str):
-                            replacement = replacement(node)
-                        self.edit_code(node, replacement)
-                        modified_nodes.add(node)
-                        query_obj = Query(self.ast.language, query)
-                        query_cursor = QueryCursor(query_obj)
-                        matches = query_cursor.matches(self.ast.root_node)
-                        break
+        if isinstance(query, Query):
+            query_obj = query
+        else:
+            if not isinstance(query, str):
+                query = "\n".join(query)
+            query_obj = compile_query(self.ast.language, query)
+        # Collect every edit in a single pass over the matches, rather than re-running the
+        # query against the AST after each edit
+        edits: Dict[Tuple[int, int], Tuple[Node, str]] = {}
+        # Edits only depend on the captured nodes rather than on how they are grouped into
+        # matches, so all captures are retrieved at once instead of allocating a dictionary
+        # for each match
+        captures = QueryCursor(query_obj).captures(self.ast.root_node)
+        for group, replacement in groups_and_replacement.items():
+            for node in captures.get(group, []):
+                span = (node.start_byte, node.end_byte)
+                if span not in edits:
+                    edits[span] = (
+                        node,
+                        (
+                            replacement
+                            if isinstance(replacement, str)
+                            else replacement(node)
+                        ),
+                    )
+        # Skip nodes nested in a node that is replaced, since the outer replacement
+        # already covers them
+        outermost_edits: List[Tuple[Node, str]] = []
+        end = 0
+        for (start_byte, end_byte), edit in sorted(
+            edits.items(), key=lambda e: (e[0][0], -e[0][1])
+        ):
+            if start_byte >= end:
+                outermost_edits.append(edit)
+                end = end_byte
+        # Record the edits from the end of the source code, so that the byte offsets of the
+        # remaining edits stay valid, then re-parse once for all of them
+        for node, new_code in reversed(outermost_edits):
+            self._record_edit(node, new_code)
+        self.flush()
+
+
+def replace_symbols(text: str, symbol_mapping: Mapping[str, str]) -> str:
+    """
+    Replaces whole-word occurrences of symbols in text in a single pass.
+
+    Parameters:
+        text: The text containing the symbols, such as assembly code.
+        symbol_mapping: A mapping from the original symbols to their replacements.
+
+    Returns:
+        The text with all symbols replaced.
+    """
+    if not symbol_mapping:
+        return text
+    # Longer symbols are tried first so a symbol is never matched by one of its prefixes
+    pattern = re.compile(
+        r"\b("
+        + "|".join(re.escape(s) for s in sorted(symbol_mapping, key=len, reverse=True))
+        + r")\b"
+    )
+    return pattern.sub(lambda m: symbol_mapping[m.group(1)], text)
 
 
 def requires_extra(
@@ -303,8 +481,21 @@ def iter_queue(queue: Queue[T]) -> Generator[T, None, None]:
     Returns:
         A generator that yields each item from the queue.
     """
-    while not queue.empty():
-        yield queue.get()
+    # get_nowait checks for and removes an item under a single lock, unlike checking
+    # empty() before each get(), which can block if another consumer takes the last item
+    while True:
+        try:
+            item = queue.get_nowait()
+        except Empty:
+            return
+        yield item
+
+
+@cache
+def _get_temp_dir() -> Path:
+    # Checkpoint files are looked up for every checkpoint, so the temporary directory is only
+    # resolved once
+    return Path(tempfile.gettempdir())
 
 
 def get_checkpoint_file(prefix: str) -> Path:
@@ -312,7 +503,7 @@ def get_checkpoint_file(prefix: str) -> Path:
     Returns the checkpoint file path for the current process based on the given prefix.
 
     The checkpoint file is stored in the system temporary directory and named using
-    the format: `{prefix}_{pid}.json`.
+    the format: `{prefix}_{pid}.jsonl`.
 
     Parameters:
         prefix: The filename prefix for the checkpoint file.
@@ -320,35 +511,85 @@ def get_checkpoint_file(prefix: str) -> Path:
     Returns:
         A `Path` object pointing to the checkpoint file.
     """
-    return Path(tempfile.gettempdir()) / f"{prefix}_{os.getpid()}.json"
+    return _get_temp_dir() / f"{prefix}_{os.getpid()}.jsonl"
 
 
 def get_checkpoint_files(prefix: str) -> List[Path]:
     """
     Retrieves all checkpoint files matching the given prefix.
 
+    Only files named `{prefix}_*.jsonl` are matched. Checkpoint files written by older versions
+    (`{prefix}_{pid}.json`, holding a single JSON array) are ignored.
+
     Parameters:
         prefix: The filename prefix used to locate checkpoint files.
 
     Returns:
         A list of `Path` objects for all matching checkpoint files.
     """
-    return list(Path(tempfile.gettempdir()).glob(f"{prefix}_*"))
+    # Match the prefix while scanning the directory, rather than compiling a glob pattern
+    file_prefix = f"{prefix}_"
+    with os.scandir(_get_temp_dir()) as entries:
+        return [
+            Path(e.path)
+            for e in entries
+            if e.name.startswith(file_prefix) and e.name.endswith(".jsonl")
+        ]
+
+
+CHECKPOINT_BUFFER_SIZE: Final[int] = 2**20
+"""
+Size of the write buffer used when appending to checkpoint files, in bytes.
+"""
+
+
+def dump_json(json_obj: Any) -> bytes:
+    """
+    Encodes an object as UTF-8 JSON.
+
+    The object is encoded with `orjson` if it is installed, since it encodes much faster than
+    the `json` module.
+
+    Parameters:
+        json_obj: The JSON-serializable object to encode.
+
+    Returns:
+        The encoded JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(json_obj)
+    return json.dumps(json_obj).encode()
+
+
+def _dump_json_line(json_obj: JSONObject) -> bytes:
+    return dump_json(json_obj) + b"\n"
+
+
+def _load_json_line(line: bytes) -> JSONObject:
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
 
 
 def save_checkpoint_file(prefix: str, contents: Iterable[SupportsJSON]) -> None:
     """
-    Saves checkpoint data to a file based on the given prefix.
+    Appends checkpoint data to a file based on the given prefix.
 
-    The contents are converted to JSON and written to a checkpoint file named
-    `{prefix}_{pid}.json` in the system temporary directory.
+    Checkpoint files are append-only: the contents are converted to JSON and appended, one
+    object per line, to a checkpoint file named `{prefix}_{pid}.jsonl` in the system temporary
+    directory. Callers should only pass the entries produced since the last checkpoint, so
+    that each entry is only written once. The contents are encoded with `orjson` if it is
+    installed.
 
     Parameters:
         prefix: The filename prefix for the checkpoint file.
         contents: An iterable of objects that support JSON serialization via `to_json()`.
     """
     checkpoint_file = get_checkpoint_file(prefix)
-    checkpoint_file.write_text(json.dumps([c.to_json() for c in contents]))
+    # Each entry is encoded and written as it is produced, so only the encoded lines waiting
+    # in the write buffer are held in memory
+    with open(checkpoint_file, "ab", buffering=CHECKPOINT_BUFFER_SIZE) as file:
+        file.writelines(_dump_json_line(c.to_json()) for c in contents)
 
 
 def load_checkpoint_data(prefix: str, delete_on_load: bool = False) -> List[JSONObject]:
@@ -369,7 +610,8 @@ def load_checkpoint_data(prefix: str, delete_on_load: bool = False) -> List[JSON
     checkpoint_files = get_checkpoint_files(prefix)
     for checkpoint_file in checkpoint_files:
         logger.debug(f'Loading checkpoint data from "{checkpoint_file.name}"')
-        checkpoint_data.extend(json.loads(checkpoint_file.read_text()))
+        with open(checkpoint_file, "rb") as file:
+            checkpoint_data.extend(_load_json_line(line) for line in file)
         if delete_on_load:
             logger.debug(f'Removing checkpoint file "{checkpoint_file.name}"')
             checkpoint_file.unlink(missing_ok=True)
@@ -456,6 +698,11 @@ def execute_command(
             break  # Exit loop on success
 
         except subprocess.CalledProcessError as e:
+            # Imported lazily since rich is only needed to report failures, and importing it
+            # at module level adds to the startup time of every worker importing this module
+            from rich import print
+            from rich.prompt import Prompt
+
             output = e.output
             logger.error(f"Command failed: {repr(command)}")
             if print_errors:
@@ -560,7 +807,7 @@ def prepared_dir(
             logger.debug(f"Rebased directory created under {repr(parent_dir.name)}")
             # Rebase subpaths
             normalized_subpaths = {path / s for s in relative_subpaths}
-            if any(normalized_subpaths):
+            if normalized_subpaths:
                 logger.debug(
                     "Rebased subpaths: "
                     ", ".join(
@@ -589,15 +836,23 @@ def prepared_dir(
 
 DynamicSymbol = Tuple[Path, str]
 
+_dynamic_imports: Dict[Tuple[Path, str], Any] = {}
+
 
 def dynamic_import(dynamic_symbol: DynamicSymbol) -> Any:
     file, symbol = dynamic_symbol
     file = Path(file)
+    # Imported modules are never reloaded, so previously resolved symbols can be reused
+    cached_symbol = _dynamic_imports.get((file, symbol))
+    if cached_symbol is not None:
+        return cached_symbol
     # Add parent directory to sys.path to allow for dynamic imports of extractors and mappers
-    sys.path.insert(0, str(file.parent))
+    parent_dir = str(file.parent)
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
     try:
         module = importlib.import_module(file.stem)
-        return getattr(module, symbol)
+        imported_symbol = getattr(module, symbol)
     except ModuleNotFoundError as e:
         if e.name == file.stem:
             raise ValueError(f"Cannot locate {repr(file.name)}") from e
@@ -606,6 +861,8 @@ def dynamic_import(dynamic_symbol: DynamicSymbol) -> Any:
         if e.name == symbol:
             raise ValueError(f"Cannot find {repr(symbol)} in {repr(file.name)}") from e
         raise
+    _dynamic_imports[(file, symbol)] = imported_symbol
+    return imported_symbol
 
 
 BuiltinSymbols = Mapping[str, DynamicSymbol]
@@ -631,9 +888,133 @@ P = ParamSpec("P")  # The parameters of the flow
 
 CODABLELLM_PARALLEL_TASKS_ENVIRON_KEY: Final[str] = "CODABLELLM_PARALLEL_TASKS"
 CODABLELLM_MAX_WORKERS_ENVIRON_KEY: Final[str] = "CODABLELLM_MAX_WORKERS"
+CODABLELLM_WORKER_LIFETIME_ENVIRON_KEY: Final[str] = "CODABLELLM_WORKER_LIFETIME"
+
+
+_dask_clusters: Dict[Optional[int], LocalCluster] = {}
+# Guards _dask_clusters, so that concurrent flows share one cluster per worker count
+_dask_clusters_lock = threading.Lock()
+_worker_preloads: List[Callable[[], Iterable[DynamicSymbol]]] = []
+
+
+def register_worker_preload(get_symbols: Callable[[], Iterable[DynamicSymbol]]) -> None:
+    """
+    Registers a callable returning dynamic symbols to import in each Dask worker at startup.
+
+    Parameters:
+        get_symbols: A callable that returns the dynamic symbols to import. It is called when a
+            cluster is created, so it sees the symbols registered at that time.
+    """
+    _worker_preloads.append(get_symbols)
+
+
+def _preload_symbols(symbols: Iterable[DynamicSymbol]) -> None:
+    for symbol in symbols:
+        try:
+            dynamic_import(symbol)
+        except Exception:
+            # Symbols that cannot be imported (e.g. languages whose extra is not installed)
+            # fail the same way when a task first uses them
+            logger.debug(f"Could not preload {symbol[0]}::{symbol[1]}", exc_info=True)
+
+
+class _PreloadPlugin(WorkerPlugin):
+    # Worker plugins are kept by the scheduler and set up on every worker that joins the
+    # cluster, including workers restarted once their lifetime is reached
+
+    def __init__(self, symbols: Collection[DynamicSymbol]) -> None:
+        self.symbols = list(symbols)
+
+    def setup(self, worker: Any) -> None:
+        _preload_symbols(self.symbols)
+
+
+def get_dask_cluster(n_workers: Optional[int] = None) -> LocalCluster:
+    """
+    Returns a local Dask cluster that is shared by all parallel flows in this process.
+
+    The cluster is created on first use and closed when the interpreter exits, so worker
+    processes are only spawned, and only import `codablellm`, once rather than for every flow.
+    Symbols registered with `register_worker_preload` are imported in each worker when it
+    starts. This function is thread-safe.
+
+    If `CODABLELLM_WORKER_LIFETIME` is set, each worker is restarted once it has lived that
+    long, so memory leaked by long-running decompilers is returned to the OS. Restarts are
+    staggered so the workers are not all restarted at once.
+
+    Parameters:
+        n_workers: The number of worker processes, or `None` to use Dask's default.
+
+    Returns:
+        The shared local Dask cluster with the given number of workers.
+    """
+    with _dask_clusters_lock:
+        cluster = _dask_clusters.get(n_workers)
+        if cluster is None:
+            cluster_kwargs: Dict[str, Any] = (
+                {"n_workers": n_workers} if n_workers else {}
+            )
+            lifetime = os.environ.get(CODABLELLM_WORKER_LIFETIME_ENVIRON_KEY)
+            if lifetime:
+                cluster_kwargs.update(
+                    lifetime=lifetime,
+                    lifetime_stagger="1 minute",
+                    lifetime_restart=True,
+                )
+            cluster = LocalCluster(**cluster_kwargs)
+            atexit.register(cluster.close)
+            # Import registered extractors and decompilers in every worker up front, so the
+            # first task on each worker does not pay for the imports
+            _register_preload(
+                cluster,
+                [s for get_symbols in _worker_preloads for s in get_symbols()],
+            )
+            _dask_clusters[n_workers] = cluster
+        return cluster
+
+
+def _register_preload(
+    cluster: LocalCluster, symbols: Collection[DynamicSymbol]
+) -> None:
+    if symbols:
+        # Plugins with the same name replace each other, so the name identifies the symbols
+        name = "codablellm-preload:" + ",".join(f"{f}::{s}" for f, s in symbols)
+        with Client(cluster) as client:
+            client.register_plugin(_PreloadPlugin(symbols), name=name)
+
+
+def preload_in_workers(*symbols: DynamicSymbol) -> None:
+    """
+    Imports dynamic symbols in the workers of every shared Dask cluster created so far.
+
+    This lets symbols registered after a cluster was created (e.g. a newly registered
+    extractor) be imported ahead of the first task that needs them. The symbols are also
+    imported in workers that start later, such as restarted workers.
+
+    Parameters:
+        symbols: The dynamic symbols to import.
+    """
+    with _dask_clusters_lock:
+        clusters = list(_dask_clusters.values())
+    for cluster in clusters:
+        _register_preload(cluster, symbols)
 
 
 def codablellm_flow() -> Callable[[Callable[P, R]], Flow[P, R]]:
+    """
+    Decorator that runs a function as a Prefect flow with the task runner selected by the
+    environment.
+
+    Tasks run on a thread pool by default. Extraction is dominated by file reads and
+    tree-sitter parsing, both of which release the GIL, so threads scale without pickling
+    extractors and paths for every task. Setting `CODABLELLM_PARALLEL_TASKS` to `true` runs
+    tasks on a Dask cluster of worker processes instead, which suits Python-heavy extractors
+    and decompilers.
+
+    Returns:
+        A decorator that wraps a function in a dynamically configured Prefect flow.
+    """
+
     def decorator(func: Callable[P, R]) -> Flow[P, R]:
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> R:
@@ -645,8 +1026,9 @@ def codablellm_flow() -> Callable[[Callable[P, R]], Flow[P, R]]:
             if max_tasks < 1:
                 max_tasks = None
             if parallel_task_runner:
-                cluster_kwargs = {"n_workers": max_tasks} if max_tasks else {}
-                task_runner = DaskTaskRunner(cluster_kwargs=cluster_kwargs)
+                task_runner = DaskTaskRunner(
+                    address=get_dask_cluster(max_tasks).scheduler_address
+                )
             else:
                 if max_tasks:
                     max_tasks += 1
@@ -667,4 +1049,78 @@ codablellm_task = partial(
 codablellm_low_level_task = partial(
     codablellm_task,
     on_completion=[lambda t, r, s: benchmark_task(t, r, s, log_as="debug")],
+    # Low-level tasks run once per file or binary, and their results are never cached, so
+    # skip serializing their inputs (e.g. extractor and decompiler instances) into cache keys
+    cache_policy=NONE,
 )
+
+
+def submit_bounded(
+    submit: Callable[[T], PrefectFuture[R]],
+    items: Iterable[T],
+    max_pending: int,
+) -> Generator[PrefectFuture[R], None, None]:
+    """
+    Submits a task for each item while capping the number of in-flight futures.
+
+    Once `max_pending` futures are in flight, submission blocks until one of them completes,
+    so the pending task arguments and unconsumed results never grow beyond `max_pending`.
+
+    Parameters:
+        submit: A callable that submits the task for a single item and returns its future.
+        items: The items to submit tasks for.
+        max_pending: The maximum number of futures that may be in flight at once.
+
+    Returns:
+        A generator that yields the submitted futures in completion order.
+    """
+    if max_pending < 1:
+        raise ValueError("Max pending must be a positive integer")
+    # Each future queues itself once it is done, so waiting for a future blocks on the queue
+    # rather than registering a new callback on every pending future for each wait. A FIFO
+    # SimpleQueue yields futures in the order they completed, and its put() is safe to call
+    # from done callbacks running on other threads
+    completed: SimpleQueue[PrefectFuture[R]] = SimpleQueue()
+    num_pending = 0
+    for item in items:
+        if num_pending >= max_pending:
+            yield completed.get()
+            num_pending -= 1
+        submit(item).add_done_callback(completed.put)
+        num_pending += 1
+    for _ in range(num_pending):
+        yield completed.get()
+
+
+def get_max_pending(max_workers: Optional[int]) -> int:
+    """
+    Returns the number of futures that may be in flight for the given number of workers.
+
+    Parameters:
+        max_workers: The maximum number of workers, or `None` to use the number of CPUs.
+
+    Returns:
+        Twice the number of workers, so that every worker always has a queued task.
+    """
+    return 2 * (max_workers or os.cpu_count() or 1)
+
+
+def iter_batches(items: Iterable[T], size: int) -> Generator[List[T], None, None]:
+    """
+    Lazily groups items into batches of a fixed size.
+
+    Parameters:
+        items: The items to group.
+        size: The maximum number of items in each batch.
+
+    Returns:
+        A generator that yields lists of at most `size` items. Only the last batch may be smaller.
+    """
+    if size < 1:
+        raise ValueError("Batch size must be a positive integer")
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
@@ -2,9 +2,12 @@
 Code dataset generation.
 """
 
+import csv
+import json
 import logging
 import os
 from abc import ABC, abstractmethod
+from collections import defaultdict
 from collections.abc import Mapping
 from dataclasses import dataclass, field, replace
 from pathlib import Path
@@ -12,49 +15,220 @@ from typing import (
     Any,
     Callable,
     Collection,
+    DefaultDict,
     Dict,
     Final,
+    FrozenSet,
     Iterable,
     Iterator,
     List,
     Literal,
     NamedTuple,
     Optional,
+    Sequence,
     TypeVar,
     Union,
 )
 from typing_extensions import deprecated
 
-from pandas import DataFrame
+from pandas import DataFrame, Index
 from prefect import task
 
 from codablellm.core import decompiler, extractor, utils
-from codablellm.core.function import DecompiledFunction, SourceFunction
+from codablellm.core.function import DecompiledFunction, Function, SourceFunction
 from codablellm.core.mapper import DEFAULT_MAPPER, Mapper
 
 logger = logging.getLogger(__name__)
 
 
+def _flatten_metadata(df: DataFrame, functions: Sequence[Function]) -> DataFrame:
+    # Adds a column for each metadata key of the functions, which may override a column
+    # of the same name
+    if any(f.metadata for f in functions):
+        metadata_df = DataFrame.from_records(
+            [dict(f.metadata) for f in functions], index=df.index
+        )
+        for column in metadata_df.columns:
+            df[column] = metadata_df[column]
+    return df
+
+
+def _to_json(dataset: "Dataset", path: Path) -> None:
+    # Records are encoded and written one at a time, so the dataset is never materialized
+    # as a DataFrame
+    with open(path, "wb") as file:
+        file.write(b"[")
+        for i, record in enumerate(dataset.iter_records(index=False)):
+            if i:
+                file.write(b",")
+            file.write(utils.dump_json(record))
+        file.write(b"]")
+
+
+def _to_jsonl(dataset: "Dataset", path: Path) -> None:
+    with open(path, "wb") as file:
+        for record in dataset.iter_records(index=False):
+            file.write(utils.dump_json(record))
+            file.write(b"\n")
+
+
+EXPORT_BUFFER_SIZE: Final[int] = 2**20
+"""
+Size of the write buffer used when streaming CSV and TSV exports, in bytes.
+"""
+
+
+def _write_delimited(dataset: "Dataset", path: Path, delimiter: str) -> None:
+    records = dataset.iter_records()
+    # Rows are small, so a large write buffer keeps the export from issuing a write call for
+    # every few rows
+    with open(
+        path, "w", encoding="utf-8", newline="", buffering=EXPORT_BUFFER_SIZE
+    ) as file:
+        first_record = next(records, None)
+        if first_record is None:
+            return
+        # Every record has the same fields, so the header is taken from the first one
+        writer = csv.DictWriter(
+            file, fieldnames=list(first_record), delimiter=delimiter
+        )
+        writer.writeheader()
+        writer.writerow(first_record)
+        writer.writerows(records)
+
+
+def _to_csv(dataset: "Dataset", path: Path) -> None:
+    _write_delimited(dataset, path, ",")
+
+
+def _to_tsv(dataset: "Dataset", path: Path) -> None:
+    _write_delimited(dataset, path, "\t")
+
+
+def _to_excel_value(value: Any) -> Any:
+    # Excel cells only hold scalars, so nested values (such as the source function columns of
+    # decompiled datasets) are written as their string representations
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+@utils.requires_extra("excel", "Excel exports", "openpyxl")
+def _to_excel(dataset: "Dataset", path: Path) -> None:
+    from openpyxl import Workbook
+
+    # A write-only workbook streams rows to the file as they are appended, rather than
+    # creating a styled cell object for every value like the pandas Excel writer
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Sheet1")
+    records = dataset.iter_records()
+    first_record = next(records, None)
+    if first_record is not None:
+        worksheet.append(list(first_record))
+        worksheet.append([_to_excel_value(v) for v in first_record.values()])
+        for record in records:
+            worksheet.append([_to_excel_value(v) for v in record.values()])
+    workbook.save(path)
+
+
+@utils.requires_extra("markdown", "Markdown exports", "tabulate")
+def _to_markdown(dataset: "Dataset", path: Path) -> None:
+    dataset.to_df().to_markdown(path)
+
+
+def _to_latex(dataset: "Dataset", path: Path) -> None:
+    dataset.to_df().to_latex(path)
+
+
+def _to_html(dataset: "Dataset", path: Path) -> None:
+    dataset.to_df().to_html(path)
+
+
+@utils.requires_extra("xml", "XML exports", "lxml")
+def _to_xml(dataset: "Dataset", path: Path) -> None:
+    dataset.to_df().to_xml(path)
+
+
+@utils.requires_extra("parquet", "Parquet exports", "pyarrow")
+def _to_parquet(dataset: "Dataset", path: Path) -> None:
+    dataset.to_df().to_parquet(path, compression="zstd")
+
+
+@utils.requires_extra("parquet", "Feather exports", "pyarrow")
+def _to_feather(dataset: "Dataset", path: Path) -> None:
+    # Feather does not store a DataFrame index, so keep the UIDs as a column
+    dataset.to_df().reset_index().to_feather(path)
+
+
+_WRITERS: Final[Dict[str, Callable[["Dataset", Path], None]]] = {
+    ".json": _to_json,
+    ".jsonl": _to_jsonl,
+    ".csv": _to_csv,
+    ".tsv": _to_tsv,
+    ".xlsx": _to_excel,
+    ".xls": _to_excel,
+    ".xlsm": _to_excel,
+    ".md": _to_markdown,
+    ".markdown": _to_markdown,
+    ".tex": _to_latex,
+    ".html": _to_html,
+    ".htm": _to_html,
+    ".xml": _to_xml,
+    ".parquet": _to_parquet,
+    ".feather": _to_feather,
+}
+"""
+Writers used by `Dataset.save_as`, keyed by casefolded file extension.
+"""
+
+SUPPORTED_EXTENSIONS: Final[FrozenSet[str]] = frozenset(_WRITERS)
+"""
+Casefolded file extensions supported by `Dataset.save_as`.
+"""
+
+
 class Dataset(ABC):
     """
     A code dataset.
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def to_df(self) -> DataFrame:
         """
         Converts the code dataset to a pandas DataFrame.
 
+        Datasets are immutable, so the DataFrame is only built on the first call and the same
+        DataFrame is returned afterwards. Copy it before modifying it.
+
         Returns:
             A pandas DataFrame representation of the code dataset.
         """
         pass
 
+    @abstractmethod
+    def iter_records(self, index: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily converts the entries of the code dataset to records.
+
+        Every record has the same fields, in the same order as the columns of `to_df`, so
+        that the dataset can be exported without materializing it as a DataFrame.
+
+        Parameters:
+            index: Whether to include the UID of each entry as the first field of its record.
+
+        Returns:
+            An iterator over a record for each entry in the code dataset.
+        """
+        pass
+
     def save_as(self, path: utils.PathLike) -> None:
         """
-        Converts the dataset to a DataFrame and exports it to the specified file path based on
-        its extension. The export format is determined by the file extension provided in the
-        `path` parameter.
+        Exports the dataset to the specified file path based on its extension. The export
+        format is determined by the file extension provided in the `path` parameter. JSON,
+        JSONL, CSV, and TSV exports are streamed record by record, while the other formats
+        convert the dataset to a DataFrame first.
 
         Example:
             ```py
@@ -64,13 +238,15 @@ class Dataset(ABC):
             Successfully saves the dataset as an Excel file to "output.xlsx".
 
         Supported Formats and Extensions:
-            - JSON: .json, .jsonl
+            - JSON: .json, .jsonl **(encoded faster with codablellm[orjson])**
             - CSV/TSV: .csv, .tsv
             - Excel: .xlsx, .xls, .xlsm **(requires codablellm[excel])**
             - Markdown: .md, .markdown **(requires codablellm[markdown])**
             - LaTeX: .tex
             - HTML: .html, .htm
             - XML: .xml **(requires codablellm[xml])**
+            - Parquet: .parquet **(requires codablellm[parquet])**
+            - Feather: .feather **(requires codablellm[parquet])**
 
         Parameters:
             path: Path to save the dataset at.
@@ -79,41 +255,11 @@ class Dataset(ABC):
             ValueError: If the provided file extension is unsupported.
             ExtraNotInstalled: If the file extension requires an additional library that is not installed.
         """
-
-        @utils.requires_extra("excel", "Excel exports", "openpyxl")
-        def to_excel(df: DataFrame, path: Path) -> None:
-            df.to_excel(path)
-
-        @utils.requires_extra("xml", "XML exports", "lxml")
-        def to_xml(df: DataFrame, path: Path) -> None:
-            df.to_xml(path)
-
-        @utils.requires_extra("markdown", "Markdown exports", "tabulate")
-        def to_markdown(df: DataFrame, path: Path) -> None:
-            df.to_markdown(path)
-
         path = Path(path)
-        extension = path.suffix.casefold()
-        if extension in [e.casefold() for e in [".json", ".jsonl"]]:
-            self.to_df().to_json(
-                path, lines=extension == ".jsonl".casefold(), orient="records"
-            )
-        elif extension in [e.casefold() for e in [".csv", ".tsv"]]:
-            self.to_df().to_csv(
-                path, sep="," if extension == ".csv".casefold() else "\t"
-            )
-        elif extension in [e.casefold() for e in [".xlsx", ".xls", ".xlsm"]]:
-            to_excel(self.to_df(), path)
-        elif extension in [e.casefold() for e in [".md", ".markdown"]]:
-            to_markdown(self.to_df(), path)
-        elif extension == ".tex".casefold():
-            self.to_df().to_latex(path)
-        elif extension in [e.casefold() for e in [".html", ".htm"]]:
-            self.to_df().to_html(path)
-        elif extension == ".xml".casefold():
-            to_xml(self.to_df(), path)
-        else:
+        writer = _WRITERS.get(path.suffix.casefold())
+        if not writer:
             raise ValueError(f"Unsupported file extension: {path.suffix}")
+        writer(self, path)
         logger.info(f"Successfully saved {path.name}")
 
 
@@ -190,15 +336,39 @@ class SourceCodeDataset(Dataset, Mapping[str, SourceFunction]):
     source functions, allowing indexing and mapping by unique identifiers (UIDs)
     """
 
-    def __init__(self, functions: Iterable[SourceFunction]) -> None:
+    # Datasets are created per mapped function, so avoid a per-instance __dict__
+    __slots__ = ("_mapping", "_root", "_df")
+
+    def __init__(
+        self,
+        functions: Iterable[SourceFunction],
+        root: Optional[utils.PathLike] = None,
+    ) -> None:
         """
         Initializes a new source code dataset instance with a collection of source functions.
 
         Parameters:
             functions: An iterable collection of source code functions used to populate the dataset.
+            root: Path to the repository the source functions were extracted from, if known. Returned by `get_common_directory` instead of computing the common path of every function.
         """
         super().__init__()
         self._mapping: Dict[str, SourceFunction] = {f.uid: f for f in functions}
+        if root is not None:
+            # A single file can be extracted as a repository, but the root is its directory
+            root = Path(root)
+            self._root: Optional[Path] = root if root.is_dir() else root.parent
+        else:
+            self._root = None
+        self._df: Optional[DataFrame] = None
+
+    @classmethod
+    def _from_mapping(cls, mapping: Dict[str, SourceFunction]) -> "SourceCodeDataset":
+        # Takes ownership of an existing UID mapping without re-inserting each function
+        dataset = cls.__new__(cls)
+        dataset._mapping = mapping
+        dataset._root = None
+        dataset._df = None
+        return dataset
 
     def __getitem__(self, key: Union[str, SourceFunction]) -> SourceFunction:
         if isinstance(key, SourceFunction):
@@ -220,22 +390,61 @@ class SourceCodeDataset(Dataset, Mapping[str, SourceFunction]):
             return default
 
     def to_df(self) -> DataFrame:
-        function_dicts: List[Dict[str, Any]] = []
-        for function in self.values():
-            function_json = function.to_json()
-            function_dict = dict(function_json)
-            # Flatten SourceFunction.metadata
-            del function_dict["metadata"]
-            function_dict.update(function_json["metadata"])
-            function_dicts.append(function_dict)
-        try:
-            return DataFrame(function_dicts).set_index("uid")
-        except KeyError:
+        if self._df is None:
+            self._df = self._create_df()
+        return self._df
+
+    def _create_df(self) -> DataFrame:
+        functions = list(self.values())
+        if not functions:
             logger.debug(
                 'Could not set DataFrame index to "uid", returning an empty '
                 "DataFrame to assume that the DataFrame is empty"
             )
             return DataFrame()
+        # Assemble the DataFrame column by column from the function fields, rather than
+        # serializing every function to a JSON dictionary and letting pandas transpose them
+        df = DataFrame(
+            {
+                "language": [f.language for f in functions],
+                "start_byte": [f.start_byte for f in functions],
+                "end_byte": [f.end_byte for f in functions],
+                "class_name": [f.class_name for f in functions],
+                "definition": [f.definition for f in functions],
+                "name": [f.name for f in functions],
+                "path": [str(f.path) for f in functions],
+            },
+            index=Index([f.uid for f in functions], name="uid"),
+        )
+        return _flatten_metadata(df, functions)
+
+    def iter_records(self, index: bool = True) -> Iterator[Dict[str, Any]]:
+        columns = dict.fromkeys(
+            (
+                "language",
+                "start_byte",
+                "end_byte",
+                "class_name",
+                "definition",
+                "name",
+                "path",
+            )
+        )
+        columns.update(dict.fromkeys(k for f in self.values() for k in f.metadata))
+        for uid, function in self._mapping.items():
+            record: Dict[str, Any] = {"uid": uid} if index else {}
+            record.update(columns)
+            record.update(
+                language=function.language,
+                start_byte=function.start_byte,
+                end_byte=function.end_byte,
+                class_name=function.class_name,
+                definition=function.definition,
+                name=function.name,
+                path=str(function.path),
+            )
+            record.update(function.metadata)
+            yield record
 
     def get_common_directory(self) -> Path:
         """
@@ -245,8 +454,11 @@ class SourceCodeDataset(Dataset, Mapping[str, SourceFunction]):
         Returns:
             The common directory path for all dataset entries.
         """
-        common_path = Path(os.path.commonpath(p.path for p in self.values()))
-        return common_path if common_path.is_dir() else common_path.parent
+        if self._root is None:
+            # The dataset is never mutated, so the common directory only has to be computed once
+            common_path = Path(os.path.commonpath(p.path for p in self.values()))
+            self._root = common_path if common_path.is_dir() else common_path.parent
+        return self._root
 
     @classmethod
     def create_aligned_dataset(
@@ -259,25 +471,30 @@ class SourceCodeDataset(Dataset, Mapping[str, SourceFunction]):
             original = cls(function for function in original)
         if not isinstance(transformed, SourceCodeDataset):
             transformed = cls(function for function in transformed)
-        annotated_functions: List[SourceFunction] = []
-        for transformed_function in transformed.values():
-            # Check if UID's match in original dataset
-            function = original.get(transformed_function)
-            if function:
-                # Annotate with metadata
-                logger.info(f"Annotating {function.uid}...")
-                annotated_function = replace(
-                    function,
-                    _metadata={
-                        **function.metadata,
-                        "transformed_definition": transformed_function.definition,
-                        "transformed_class_name": transformed_function.class_name,
-                    },
-                )
-                annotated_functions.append(annotated_function)
-            else:
-                logger.warning(f'Could not locate UID "{transformed_function.uid}"')
-        return cls(annotated_functions)
+
+        def iter_annotated_functions(
+            original: SourceCodeDataset, transformed: SourceCodeDataset
+        ) -> Iterator[SourceFunction]:
+            # Annotated functions are streamed into the new dataset instead of being
+            # collected into an intermediate list first
+            for transformed_function in transformed.values():
+                # Check if UID's match in original dataset
+                function = original.get(transformed_function)
+                if function:
+                    # Annotate with metadata
+                    logger.info(f"Annotating {function.uid}...")
+                    yield replace(
+                        function,
+                        _metadata={
+                            **function.metadata,
+                            "transformed_definition": transformed_function.definition,
+                            "transformed_class_name": transformed_function.class_name,
+                        },
+                    )
+                else:
+                    logger.warning(f'Could not locate UID "{transformed_function.uid}"')
+
+        return cls(iter_annotated_functions(original, transformed))
 
     @classmethod
     @utils.codablellm_task(
@@ -328,22 +545,41 @@ class SourceCodeDataset(Dataset, Mapping[str, SourceFunction]):
             set_env_var=False,
         ) as path:
             logger.info("Submitting extraction task...")
-            # Extract source code functions on the path/temp directory
-            futures = extractor.extract_directory_task.submit(
-                path, config.extract_config
-            )
             if config.generation_mode == "temp-append":
-                # Create a copy of the extract config to extract the path without a transform
+                # The temp directory is a copy of the repository, so extract it once without
+                # the transform and reuse the functions as the original functions, rather
+                # than extracting the repository a second time
                 no_transform_extract_config = replace(
                     config.extract_config, transform=None
                 )
-                original_futures = extractor.extract_directory_task.submit(
-                    original_path, config=no_transform_extract_config
+                functions = extractor.extract_directory_task.submit(
+                    path, config=no_transform_extract_config
+                ).result()
+                # UIDs are relative to the repository, so only the paths need rebasing. Function
+                # paths must be absolute, so the repository is resolved once up front
+                original_dir = Path(original_path).resolve()
+                original_functions = [
+                    replace(f, path=original_dir / f.path.relative_to(path))
+                    for f in functions
+                ]
+                logger.info("Applying transformation...")
+                transformed_functions = extractor.transform_functions(
+                    functions, config.extract_config
+                )
+                dataset = cls.create_aligned_dataset(
+                    original_functions, transformed_functions
                 )
-                return cls.create_aligned_dataset(
-                    original_futures.result(), futures.result()
+                dataset._root = (
+                    original_dir if original_dir.is_dir() else original_dir.parent
                 )
-            return cls(function for function in futures.result())
+                return dataset
+            # Extract source code functions on the path/temp directory
+            futures = extractor.extract_directory_task.submit(
+                path, config.extract_config
+            )
+            return cls(
+                (function for function in futures.result()), root=Path(path).resolve()
+            )
 
 
 @dataclass(frozen=True)
@@ -389,6 +625,8 @@ class DecompiledCodeDataset(Dataset, Mapping[str, MappedFunction]):
     and their possible source code counterparts, allowing for easy lookup by unique identifiers (UIDs).
     """
 
+    __slots__ = ("_mapping", "_source_index", "_df")
+
     def __init__(self, mappings: Iterable[MappedFunction]) -> None:
         """
         Initializes a new decompiled code dataset instance with a collection of mappings
@@ -399,6 +637,8 @@ class DecompiledCodeDataset(Dataset, Mapping[str, MappedFunction]):
         """
         super().__init__()
         self._mapping: Dict[str, MappedFunction] = {m[0].uid: m for m in mappings}
+        self._source_index: Optional[Dict[str, List[MappedFunction]]] = None
+        self._df: Optional[DataFrame] = None
 
     def __getitem__(self, key: Union[str, DecompiledFunction]) -> MappedFunction:
         if isinstance(key, DecompiledFunction):
@@ -420,46 +660,108 @@ class DecompiledCodeDataset(Dataset, Mapping[str, MappedFunction]):
             return default
 
     def to_df(self) -> DataFrame:
-        function_dicts: List[Dict[str, Any]] = []
-        for decompiled_function, source_functions in self.values():
-            decompiled_function_json = decompiled_function.to_json()
-            decompiled_function_dict = dict(decompiled_function_json)
-            # Flatten DecompiledFunction.metadata
-            del decompiled_function_dict["metadata"]
-            decompiled_function_dict.update(decompiled_function_json["metadata"])
-            # Refactor names to be more specific on decompiled functions and multiple source functions
-            decompiled_function_dict["decompiled_uid"] = decompiled_function_dict.pop(
-                "uid"
-            )
-            decompiled_function_dict["bin"] = decompiled_function_dict.pop("path")
-            decompiled_function_dict["decompiled_definition"] = (
-                decompiled_function_dict.pop("definition")
-            )
-            source_functions_dict = source_functions.to_df().to_dict()
-            source_functions_dict["source_files"] = source_functions_dict.pop("path")
-            source_functions_dict["source_definitions"] = source_functions_dict.pop(
-                "definition"
-            )
-            del source_functions_dict["name"]
-            source_functions_dict["source_file_start_bytes"] = (
-                source_functions_dict.pop("start_byte")
-            )
-            source_functions_dict["source_file_end_bytes"] = source_functions_dict.pop(
-                "end_byte"
-            )
-            source_functions_dict["class_names"] = source_functions_dict.pop(
-                "class_name"
-            )
-            decompiled_function_dict.update(source_functions_dict)  # type: ignore
-            function_dicts.append(decompiled_function_dict)
-        try:
-            return DataFrame(function_dicts).set_index("decompiled_uid")
-        except KeyError:
+        if self._df is None:
+            self._df = self._create_df()
+        return self._df
+
+    def _create_df(self) -> DataFrame:
+        mappings = list(self.values())
+        if not mappings:
             logger.debug(
                 'Could not set DataFrame index to "uid", returning an empty '
                 "DataFrame to assume that the DataFrame is empty"
             )
             return DataFrame()
+        decompiled_functions = [d for d, _ in mappings]
+        source_datasets = [s for _, s in mappings]
+
+        def source_column(
+            get_value: Callable[[SourceFunction], Any],
+        ) -> List[Dict[str, Any]]:
+            # Each cell maps the UIDs of a decompiled function's potential source functions
+            # to one of their fields
+            return [
+                {uid: get_value(f) for uid, f in s._mapping.items()}
+                for s in source_datasets
+            ]
+
+        # Assemble the DataFrame column by column, rather than building a DataFrame for the
+        # source functions of every decompiled function and renaming its fields
+        df = DataFrame(
+            {
+                "assembly": [d.assembly for d in decompiled_functions],
+                "architecture": [d.architecture for d in decompiled_functions],
+                "address": [d.address for d in decompiled_functions],
+                "name": [d.name for d in decompiled_functions],
+            },
+            index=Index([d.uid for d in decompiled_functions], name="decompiled_uid"),
+        )
+        df = _flatten_metadata(df, decompiled_functions)
+        df["bin"] = [str(d.path) for d in decompiled_functions]
+        df["decompiled_definition"] = [d.definition for d in decompiled_functions]
+        df["language"] = source_column(lambda f: f.language)
+        source_metadata_keys = dict.fromkeys(
+            k for s in source_datasets for f in s._mapping.values() for k in f.metadata
+        )
+        for key in source_metadata_keys:
+            df[key] = source_column(lambda f: f.metadata.get(key))
+        df["source_files"] = source_column(lambda f: str(f.path))
+        df["source_definitions"] = source_column(lambda f: f.definition)
+        df["source_file_start_bytes"] = source_column(lambda f: f.start_byte)
+        df["source_file_end_bytes"] = source_column(lambda f: f.end_byte)
+        df["class_names"] = source_column(lambda f: f.class_name)
+        return df
+
+    def iter_records(self, index: bool = True) -> Iterator[Dict[str, Any]]:
+        decompiled_metadata_keys = dict.fromkeys(
+            k for d, _ in self.values() for k in d.metadata
+        )
+        source_metadata_keys = dict.fromkeys(
+            k for _, s in self.values() for f in s._mapping.values() for k in f.metadata
+        )
+        # Fields are assigned in the same order as the columns of to_df, so that metadata
+        # keys sharing a name with a field take the field's position
+        columns = dict.fromkeys(("assembly", "architecture", "address", "name"))
+        columns.update(decompiled_metadata_keys)
+        columns.update(dict.fromkeys(("bin", "decompiled_definition", "language")))
+        columns.update(source_metadata_keys)
+        columns.update(
+            dict.fromkeys(
+                (
+                    "source_files",
+                    "source_definitions",
+                    "source_file_start_bytes",
+                    "source_file_end_bytes",
+                    "class_names",
+                )
+            )
+        )
+        for uid, (decompiled_function, source_functions) in self._mapping.items():
+            sources = source_functions._mapping
+            record: Dict[str, Any] = {"decompiled_uid": uid} if index else {}
+            record.update(columns)
+            record.update(
+                assembly=decompiled_function.assembly,
+                architecture=decompiled_function.architecture,
+                address=decompiled_function.address,
+                name=decompiled_function.name,
+            )
+            record.update(decompiled_function.metadata)
+            record["bin"] = str(decompiled_function.path)
+            record["decompiled_definition"] = decompiled_function.definition
+            record["language"] = {u: f.language for u, f in sources.items()}
+            for key in source_metadata_keys:
+                record[key] = {u: f.metadata.get(key) for u, f in sources.items()}
+            record["source_files"] = {u: str(f.path) for u, f in sources.items()}
+            record["source_definitions"] = {u: f.definition for u, f in sources.items()}
+            record["source_file_start_bytes"] = {
+                u: f.start_byte for u, f in sources.items()
+            }
+            record["source_file_end_bytes"] = {
+                u: f.end_byte for u, f in sources.items()
+            }
+            record["class_names"] = {u: f.class_name for u, f in sources.items()}
+            yield record
 
     def lookup(self, key: Union[str, SourceFunction]) -> List[MappedFunction]:
         """
@@ -476,7 +778,17 @@ class DecompiledCodeDataset(Dataset, Mapping[str, MappedFunction]):
             A list of tuples, where each tuple consists of a decompiled function and its
             corresponding source code dataset containing the potential matches.
         """
-        return [m for m in self.values() if key in m[1]]
+        if self._source_index is None:
+            # Index the mappings by source function UID once, rather than checking every
+            # mapping on each lookup
+            source_index: DefaultDict[str, List[MappedFunction]] = defaultdict(list)
+            for mapping in self.values():
+                for uid in mapping.source_functions:
+                    source_index[uid].append(mapping)
+            self._source_index = dict(source_index)
+        if isinstance(key, SourceFunction):
+            key = key.uid
+        return list(self._source_index.get(key, []))
 
     def to_source_code_dataset(self) -> SourceCodeDataset:
         """
@@ -488,7 +800,12 @@ class DecompiledCodeDataset(Dataset, Mapping[str, MappedFunction]):
         Returns:
             A dataset containing all source functions extracted from the decompiled code dataset.
         """
-        return SourceCodeDataset(f for _, d in self.values() for f in d.values())
+        # Merge the UID mappings of the source datasets directly, rather than re-inserting
+        # every source function, many of which are shared between decompiled functions
+        mapping: Dict[str, SourceFunction] = {}
+        for _, source_functions in self.values():
+            mapping.update(source_functions._mapping)
+        return SourceCodeDataset._from_mapping(mapping)
 
     @deprecated('Use decompiler.DecompileConfig.symbol_remover = "pseudo-strip"')
     def to_stripped_dataset(self) -> "DecompiledCodeDataset":
@@ -501,8 +818,13 @@ class DecompiledCodeDataset(Dataset, Mapping[str, MappedFunction]):
         Returns:
             A new dataset where all decompiled functions have been stripped.
         """
+        mapped_functions = list(self.values())
+        stripped_functions = DecompiledFunction.strip_batch(
+            d for d, _ in mapped_functions
+        )
         return DecompiledCodeDataset(
-            MappedFunction(d.to_stripped(), s) for d, s in self.values()
+            MappedFunction(d, s)
+            for d, (_, s) in zip(stripped_functions, mapped_functions)
         )
 
     @classmethod
@@ -555,49 +877,50 @@ class DecompiledCodeDataset(Dataset, Mapping[str, MappedFunction]):
             ValueError: If `bins` is an empty sequence.
         """
         bins = [bins] if isinstance(bins, str) else bins
-        if not any(bins):
+        if not bins:
             raise ValueError("Must at least specify one binary")
         # Extract source code functions and decompile binaries in parallel
         future_functions = extractor.extract_directory_task.submit(
             path, config=extract_config
         )
-        future_bins = [
-            decompiler.decompile_bins_task.submit(
-                bin, config=dataset_config.decompiler_config
-            )
-            for bin in bins
-        ]
-        return cls.map_functions(
-            future_functions.result(),
-            [f for future in future_bins for f in future.result()],
-            config=dataset_config,
+        # Decompile all binaries under a single task so that one decompiler instance is
+        # created and shared by every decompile task, rather than one per binary
+        future_bins = decompiler.decompile_bins_task.submit(
+            *bins, config=dataset_config.decompiler_config
+        )
+        # Index the source functions while the binaries are still being decompiled, rather
+        # than waiting for both tasks before doing any of the mapping work
+        logger.info("Building function name map...")
+        function_name_map = DecompiledCodeDataset._build_function_name_map(
+            SourceCodeDataset(future_functions.result()).values()
+        )
+        return cls._map_with_function_name_map(
+            function_name_map, future_bins.result(), dataset_config
         )
 
     @staticmethod
     def _build_function_name_map(
         source_functions: Iterable[SourceFunction],
     ) -> Dict[str, List[SourceFunction]]:
-        fn_map: Dict[str, List[SourceFunction]] = {}
+        fn_map: DefaultDict[str, List[SourceFunction]] = defaultdict(list)
+        get_function_name = SourceFunction.get_function_name
         for source_function in source_functions:
-            fn_map.setdefault(
-                SourceFunction.get_function_name(source_function.uid), []
-            ).append(source_function)
-        return fn_map
+            fn_map[get_function_name(source_function.uid)].append(source_function)
+        # Return a plain dictionary so that lookups of unmapped names do not insert keys
+        return dict(fn_map)
 
     # TODO: maybe make into prefect task? Just set max threads
     @staticmethod
     def _map_decompiled_function(
         decompiled_function: DecompiledFunction,
         function_name_map: Dict[str, List[SourceFunction]],
-        config: DecompiledCodeDatasetConfig,
+        mapper: Mapper,
     ) -> Optional[MappedFunction]:
         logger.debug(f"Aligning decompiled function: {repr(decompiled_function.name)}")
         try:
             source_candidates = function_name_map.get(decompiled_function.name, [])
             source_functions = [
-                s
-                for s in source_candidates
-                if config.get_mapper()(decompiled_function, s)
+                s for s in source_candidates if mapper(decompiled_function, s)
             ]
             if not source_functions:
                 return None
@@ -630,17 +953,29 @@ class DecompiledCodeDataset(Dataset, Mapping[str, MappedFunction]):
         function_name_map = DecompiledCodeDataset._build_function_name_map(
             source.values()
         )
+        return cls._map_with_function_name_map(function_name_map, decompiled, config)
 
+    @staticmethod
+    def _map_with_function_name_map(
+        function_name_map: Dict[str, List[SourceFunction]],
+        decompiled: Iterable[DecompiledFunction],
+        config: DecompiledCodeDatasetConfig,
+    ) -> "DecompiledCodeDataset":
         logger.info("Mapping decompiled functions to source functions...")
 
-        # Gather results and filter None
+        # Resolve the mapper once rather than for every candidate, and drop unmapped
+        # functions as they are produced instead of collecting them first
+        mapper = config.get_mapper()
         mappings = [
-            DecompiledCodeDataset._map_decompiled_function(
-                func, function_name_map, config
+            m
+            for m in (
+                DecompiledCodeDataset._map_decompiled_function(
+                    func, function_name_map, mapper
+                )
+                for func in decompiled
             )
-            for func in decompiled
+            if m
         ]
-        mappings = [m for m in mappings if m]
 
         logger.info(
             f"Successfully mapped {len(mappings)} decompiled functions to "
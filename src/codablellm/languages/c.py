@@ -3,15 +3,15 @@ Functionality for extracting source code functions in the C language.
 """
 
 from pathlib import Path
-from typing import Final, Optional, Sequence, Set
+from typing import Final, Iterable, Optional, Sequence
 
 import tree_sitter_c as tsc
 from tree_sitter import Language, Parser, Query, QueryCursor
 
 from codablellm.core.extractor import Extractor
 from codablellm.core.function import SourceFunction
-from codablellm.core.utils import PathLike
-from codablellm.languages.common import rglob_file_extensions
+from codablellm.core.utils import PathLike, compile_query, get_parser
+from codablellm.languages.common import iter_file_extensions
 
 TREE_SITTER_QUERY: Final[str] = """
 (function_definition
@@ -40,7 +40,8 @@ class CExtractor(Extractor):
     """
     PARSER: Final[Parser] = Parser(LANGUAGE)
     """
-    An instance of `Parser` Tree-sitter for C.
+    An instance of `Parser` Tree-sitter for C. This parser must not be shared between threads;
+    use `codablellm.core.utils.get_parser(CExtractor.LANGUAGE)` for a thread-local parser.
     """
 
     def extract(
@@ -52,8 +53,8 @@ class CExtractor(Extractor):
             repo_path = Path(repo_path)
 
         source_bytes = file_path.read_bytes()
-        ast = CExtractor.PARSER.parse(source_bytes)
-        query = CExtractor.LANGUAGE.query(TREE_SITTER_QUERY)
+        ast = get_parser(CExtractor.LANGUAGE).parse(source_bytes)
+        query = compile_query(CExtractor.LANGUAGE, TREE_SITTER_QUERY)
 
 
         cursor = QueryCursor(query)
@@ -91,5 +92,5 @@ class CExtractor(Extractor):
                 )
         return functions
 
-    def get_extractable_files(self, path: PathLike) -> Set[Path]:
-        return rglob_file_extensions(path, [".c"])
+    def get_extractable_files(self, path: PathLike) -> Iterable[Path]:
+        return iter_file_extensions(path, [".c"])
@@ -1,13 +1,12 @@
 from abc import abstractmethod
-import itertools
 from pathlib import Path
-from typing import List, Optional, Sequence, Set
+from typing import Iterator, List, Optional, Sequence, Set
 
-from tree_sitter import Language, Parser
+from tree_sitter import Language, QueryCursor
 
 from codablellm.core.extractor import Extractor
 from codablellm.core.function import SourceFunction
-from codablellm.core.utils import PathLike
+from codablellm.core.utils import PathLike, compile_query, get_parser, iter_files
 
 
 class TreeSitterExtractor(Extractor):
@@ -24,8 +23,10 @@ class TreeSitterExtractor(Extractor):
         if repo_path is not None:
             repo_path = Path(repo_path)
         language = self.get_language()
-        ast = Parser(language).parse(file_path.read_bytes())
-        for _, group in language.query(self._query).matches(ast.root_node):
+        ast = get_parser(language).parse(file_path.read_bytes())
+        # The query is compiled once per language and reused for every file
+        query = compile_query(language, self._query)
+        for _, group in QueryCursor(query).matches(ast.root_node):
             (function_definition,) = group["function.definition"]
             (function_name,) = group["function.name"]
             (class_name,) = group.get("class.name", [None])
@@ -58,12 +59,17 @@ class TreeSitterExtractor(Extractor):
         pass
 
 
-def rglob_file_extensions(path: PathLike, extensions: List[str]) -> Set[Path]:
+def iter_file_extensions(path: PathLike, extensions: List[str]) -> Iterator[Path]:
     path = Path(path)
-    if any(path.suffix.casefold() == e.casefold() for e in extensions):
-        return {path}
-    return set(
-        itertools.chain.from_iterable(
-            [path.rglob(f"*{e}", case_sensitive=False) for e in extensions]
-        )
-    )
+    suffixes = tuple(e.casefold() for e in extensions)
+    if path.suffix.casefold() in suffixes:
+        yield path
+        return
+    # Filter by file name before allocating a Path for each matching file
+    for dirpath, name in iter_files(path):
+        if name.casefold().endswith(suffixes):
+            yield Path(dirpath, name)
+
+
+def rglob_file_extensions(path: PathLike, extensions: List[str]) -> Set[Path]:
+    return set(iter_file_extensions(path, extensions))
@@ -1,12 +1,12 @@
 from pathlib import Path
-from typing import Final, Optional, Sequence, Set
+from typing import Final, Iterable, Optional, Sequence
 
 import tree_sitter_cpp as tscpp
 from tree_sitter import Language
 
 from codablellm.core.function import SourceFunction
 from codablellm.core.utils import PathLike
-from codablellm.languages.common import TreeSitterExtractor, rglob_file_extensions
+from codablellm.languages.common import TreeSitterExtractor, iter_file_extensions
 
 TREE_SITTER_QUERY: Final[str] = (
     # Free-standing function definitions
@@ -43,8 +43,8 @@ class CPPExtractor(TreeSitterExtractor):
     def __init__(self) -> None:
         super().__init__("C++", TREE_SITTER_QUERY)
 
-    def get_extractable_files(self, path: PathLike) -> Set[Path]:
-        return rglob_file_extensions(path, [".cpp", ".cc", ".cxx", ".c++"])
+    def get_extractable_files(self, path: PathLike) -> Iterable[Path]:
+        return iter_file_extensions(path, [".cpp", ".cc", ".cxx", ".c++"])
 
     def get_language(self) -> Language:
         return Language(tscpp.language())
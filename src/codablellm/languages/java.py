@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Final, Optional, Sequence, Set
+from typing import Final, Iterable, Optional, Sequence
 
 from codablellm.decompilers.angr_decompiler import is_installed
 
@@ -12,7 +12,7 @@ from tree_sitter import Language
 
 from codablellm.core.function import SourceFunction
 from codablellm.core.utils import PathLike, requires_extra
-from codablellm.languages.common import TreeSitterExtractor, rglob_file_extensions
+from codablellm.languages.common import TreeSitterExtractor, iter_file_extensions
 
 TREE_SITTER_QUERY: Final[str] = (
     # Methods in classes
@@ -80,8 +80,8 @@ class JavaExtractor(TreeSitterExtractor):
     def __init__(self) -> None:
         super().__init__("Java", TREE_SITTER_QUERY)
 
-    def get_extractable_files(self, path: PathLike) -> Set[Path]:
-        return rglob_file_extensions(path, [".java"])
+    def get_extractable_files(self, path: PathLike) -> Iterable[Path]:
+        return iter_file_extensions(path, [".java"])
 
     @requires_extra("java", "Java source code extraction", "tree_sitter_java")
     def get_language(self) -> Language:
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Final, Optional, Sequence, Set
+from typing import Final, Iterable, Optional, Sequence
 
 try:
     import tree_sitter_javascript as tsjs
@@ -10,7 +10,7 @@ from tree_sitter import Language
 
 from codablellm.core.function import SourceFunction
 from codablellm.core.utils import PathLike, requires_extra
-from codablellm.languages.common import TreeSitterExtractor, rglob_file_extensions
+from codablellm.languages.common import TreeSitterExtractor, iter_file_extensions
 
 TREE_SITTER_QUERY: Final[str] = (
     # Function declarations
@@ -51,8 +51,8 @@ class JavaScriptExtractor(TreeSitterExtractor):
     def __init__(self) -> None:
         super().__init__("JavaScript", TREE_SITTER_QUERY)
 
-    def get_extractable_files(self, path: PathLike) -> Set[Path]:
-        return rglob_file_extensions(path, [".js", ".cjs", ".mjs"])
+    def get_extractable_files(self, path: PathLike) -> Iterable[Path]:
+        return iter_file_extensions(path, [".js", ".cjs", ".mjs"])
 
     @requires_extra(
         "javascript", "JavaScript source code extraction", "tree_sitter_javascript"
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Final, Optional, Sequence, Set
+from typing import Final, Iterable, Optional, Sequence
 
 try:
     import tree_sitter_python as tsp
@@ -10,7 +10,7 @@ from tree_sitter import Language
 
 from codablellm.core.function import SourceFunction
 from codablellm.core.utils import PathLike, requires_extra
-from codablellm.languages.common import TreeSitterExtractor, rglob_file_extensions
+from codablellm.languages.common import TreeSitterExtractor, iter_file_extensions
 
 TREE_SITTER_QUERY: Final[str] = (
     # Top-level function definitions
@@ -36,8 +36,8 @@ class PythonExtractor(TreeSitterExtractor):
     def __init__(self) -> None:
         super().__init__("Python", TREE_SITTER_QUERY)  # type: ignore
 
-    def get_extractable_files(self, path: PathLike) -> Set[Path]:
-        return rglob_file_extensions(path, [".py"])
+    def get_extractable_files(self, path: PathLike) -> Iterable[Path]:
+        return iter_file_extensions(path, [".py"])
 
     @requires_extra("python", "Python source code extraction", "tree_sitter_python")
     def get_language(self) -> Language:
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Final, Optional, Sequence, Set
+from typing import Final, Iterable, Optional, Sequence
 
 try:
     import tree_sitter_rust as tsr
@@ -10,7 +10,7 @@ from tree_sitter import Language
 
 from codablellm.core.function import SourceFunction
 from codablellm.core.utils import PathLike, requires_extra
-from codablellm.languages.common import TreeSitterExtractor, rglob_file_extensions
+from codablellm.languages.common import TreeSitterExtractor, iter_file_extensions
 
 TREE_SITTER_QUERY: Final[str] = (
     # Top-level function definitions
@@ -36,8 +36,8 @@ class RustExtractor(TreeSitterExtractor):
     def __init__(self) -> None:
         super().__init__("Rust", TREE_SITTER_QUERY)
 
-    def get_extractable_files(self, path: PathLike) -> Set[Path]:
-        return rglob_file_extensions(path, [".rs"])
+    def get_extractable_files(self, path: PathLike) -> Iterable[Path]:
+        return iter_file_extensions(path, [".rs"])
 
     @requires_extra("rust", "Rust source code extraction", "tree_sitter_rust")
     def get_language(self) -> Language:
@@ -1,16 +1,16 @@
 from pathlib import Path
-from typing import Final, Optional, Sequence, Set
+from typing import Final, Iterable, Optional, Sequence
 
 try:
     import tree_sitter_typescript as tst
 except ModuleNotFoundError:
-    tsp = None
+    tst = None
 
 from tree_sitter import Language
 
 from codablellm.core.function import SourceFunction
 from codablellm.core.utils import PathLike, requires_extra
-from codablellm.languages.common import TreeSitterExtractor, rglob_file_extensions
+from codablellm.languages.common import TreeSitterExtractor, iter_file_extensions
 
 TREE_SITTER_QUERY: Final[str] = (
     # Top-level function declarations
@@ -60,8 +60,8 @@ class TypeScriptExtendedExtractor(TreeSitterExtractor):
     def __init__(self) -> None:
         super().__init__("TypeScript Extended", TREE_SITTER_QUERY)
 
-    def get_extractable_files(self, path: PathLike) -> Set[Path]:
-        return rglob_file_extensions(path, [".tsx"])
+    def get_extractable_files(self, path: PathLike) -> Iterable[Path]:
+        return iter_file_extensions(path, [".tsx"])
 
     @requires_extra(
         "typescript", "TypeScript source code extraction", "tree_sitter_typescript"
@@ -91,11 +91,10 @@ class TypeScriptExtractor(TreeSitterExtractor):
             return self._tsx_extractor.extract(file_path, repo_path=repo_path)
         return super().extract(file_path, repo_path)
 
-    def get_extractable_files(self, path: PathLike) -> Set[Path]:
-        files = rglob_file_extensions(path, [".ts"])
+    def get_extractable_files(self, path: PathLike) -> Iterable[Path]:
+        yield from iter_file_extensions(path, [".ts"])
         if self._tsx_extractor:
-            files.update(self._tsx_extractor.get_extractable_files(path))
-        return files
+            yield from self._tsx_extractor.get_extractable_files(path)
 
     @requires_extra(
         "typescript", "TypeScript source code extraction", "tree_sitter_typescript"
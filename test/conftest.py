@@ -1,13 +1,27 @@
+from collections import OrderedDict
 from pathlib import Path
 from typing import Sequence
 
 import pytest
 
+from codablellm.core import extractor
 from codablellm.core.decompiler import Decompiler
 from codablellm.core.function import DecompiledFunction, SourceFunction
 from codablellm.core.utils import DynamicSymbol, PathLike
 
 
+@pytest.fixture(autouse=True)
+def restore_registered_extractors():
+    """
+    Restores the registered extractors after each test, since some tests register fake
+    extractors that would otherwise be used by every later extraction.
+    """
+    registered = OrderedDict(extractor._EXTRACTORS)
+    yield
+    extractor._EXTRACTORS.clear()
+    extractor._EXTRACTORS.update(registered)
+
+
 @pytest.fixture
 def dummy_decompiled_function(tmp_path: Path) -> DecompiledFunction:
     """
@@ -72,23 +72,6 @@ def test_decompile(
     Tests the high-level `decompile` function's return decompiled functions.
     """
 
-    class MockPath:
-        def __init__(self, path: str) -> None:
-            self.path = path
-
-        def is_dir(self) -> bool:
-            return True
-
-        def rglob(self, *args, **kwargs) -> List[Path]:
-            return [Path("test1"), Path("test2")]
-
-        def glob(self, *args, **kwargs) -> List[Path]:
-            return self.rglob(*args, **kwargs)
-
-        def mkdir(self, *args, **kwargs) -> None:
-            Path(self.path).mkdir(*args, **kwargs)
-
-    monkeypatch.setattr("codablellm.core.decompiler.Path", MockPath)
     monkeypatch.setattr(
         "codablellm.core.decompiler.create_decompiler",
         lambda *args, **kwargs: mock_decompiler,
@@ -101,13 +84,58 @@ def test_decompile(
         def result(self, *args, **kwargs) -> List[DecompiledFunction]:
             return [dummy_decompiled_function]
 
+        def add_done_callback(self, fn) -> None:
+            fn(self)
+
     monkeypatch.setattr(
         "codablellm.core.decompiler.decompile_task.submit",
         lambda *a, **kw: MockFuture(),
     )
 
     path = tmp_path / "test_dir"
+    (path / "nested").mkdir(parents=True)
+    (path / "test1").touch()
+    (path / "nested" / "test2").touch()
     config = DecompileConfig(recursive=True)
     results = decompiler.decompile(path, config=config)
     assert isinstance(results, list)
+    assert len(results) == 2
     assert results[0].name == "test_function"
+
+
+def test_decompile_submits_largest_binaries_first(
+    monkeypatch: pytest.MonkeyPatch,
+    mock_decompiler: Decompiler,
+    tmp_path: Path,
+):
+    """
+    Ensures binaries are submitted for decompilation in descending order of size.
+    """
+
+    monkeypatch.setattr(
+        "codablellm.core.decompiler.create_decompiler",
+        lambda *args, **kwargs: mock_decompiler,
+    )
+    monkeypatch.setattr(
+        "codablellm.core.decompiler.is_binary", lambda *args, **kwargs: True
+    )
+    submitted: List[str] = []
+
+    class MockFuture:
+        def result(self, *args, **kwargs) -> List[DecompiledFunction]:
+            return []
+
+        def add_done_callback(self, fn) -> None:
+            fn(self)
+
+    def mock_submit(decompiler, path, symbol_remover):
+        submitted.append(Path(path).name)
+        return MockFuture()
+
+    monkeypatch.setattr("codablellm.core.decompiler.decompile_task.submit", mock_submit)
+
+    (tmp_path / "small").write_bytes(b"\0")
+    (tmp_path / "large").write_bytes(b"\0" * 64)
+    (tmp_path / "medium").write_bytes(b"\0" * 16)
+    decompiler.decompile(tmp_path, config=DecompileConfig(), as_flow=False)
+    assert submitted == ["large", "medium", "small"]
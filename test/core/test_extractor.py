@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 import pytest
@@ -70,6 +71,7 @@ def test_extract_file(dummy_c_file: Path):
     (func,) = result
     assert func.uid == f"{func.path.name}::{func.name}"
 
+
 @pytest.mark.skip(reason="Race condition happening when suite is ran in parallel")
 def test_apply_transform_task(
     dummy_c_file: Path, dummy_transform_symbol: DynamicSymbol
@@ -81,3 +83,48 @@ def test_apply_transform_task(
     assert len(result) == 1
     (func,) = result
     assert func.uid == f"{func.path.name}::{func.name}"
+
+
+def test_get_subpath_prefixes(tmp_path: Path):
+    prefixes = extractor._get_subpath_prefixes(
+        tmp_path, {Path("src"), tmp_path / "lib"}
+    )
+    assert set(prefixes) == {
+        f"{tmp_path.resolve() / 'src'}{os.sep}",
+        f"{tmp_path.resolve() / 'lib'}{os.sep}",
+    }
+    assert f"{tmp_path.resolve() / 'src' / 'main.c'}{os.sep}".startswith(prefixes)
+    assert not f"{tmp_path.resolve() / 'srcs' / 'main.c'}{os.sep}".startswith(prefixes)
+
+
+def test_iter_extractable_files_excludes_subpaths(tmp_path: Path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "vendor").mkdir()
+    (tmp_path / "src" / "main.c").write_text("int main() { return 0; }")
+    (tmp_path / "vendor" / "lib.c").write_text("int lib() { return 0; }")
+    config = ExtractConfig(exclude_subpaths={Path("vendor")})
+    files = {f.name for f, _ in extractor._iter_extractable_files(tmp_path, config)}
+    assert files == {"main.c"}
+
+
+def test_extract_files_skips_failed_files(dummy_c_file: Path):
+    class DummyExtractor(Extractor):
+        def extract(self, file_path, *args, **kwargs):
+            if Path(file_path) != dummy_c_file:
+                raise ValueError("Cannot extract")
+            definition = dummy_c_file.read_text()
+            return [
+                SourceFunction.from_source(
+                    dummy_c_file, "C", definition, "test", 0, len(definition)
+                )
+            ]
+
+        def get_extractable_files(self, *args, **kwargs):
+            return {dummy_c_file}
+
+    dummy_extractor = DummyExtractor()
+    batch = [dummy_c_file, dummy_c_file.with_name("missing.c")]
+    result = extractor.extract_files_task.fn(dummy_extractor, batch, None)
+    assert [f.name for f in result] == ["test"]
+    with pytest.raises(ValueError):
+        extractor.extract_files_task.fn(dummy_extractor, batch, None, strict=True)
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import pytest
+
+from codablellm.core.function import Function, SourceFunction, WriteBackSession
+from codablellm.languages.c import CExtractor
+
+
+def test_create_uid_single_file(dummy_c_file: Path):
+    assert Function.create_uid(dummy_c_file, "test", repo_path=dummy_c_file) == (
+        "test.c::test"
+    )
+
+
+def test_create_uid_directory(tmp_path: Path):
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    file_path = repo / "src" / "main.c"
+    file_path.write_text("int main() { return 0; }")
+    assert Function.create_uid(file_path, "main", repo_path=repo) == (
+        "repo::src::main.c::main"
+    )
+    assert Function.create_uid(file_path, "main") == "main.c::main"
+    assert SourceFunction.create_uid(
+        file_path, "main", repo_path=repo, class_name="Main"
+    ) == ("repo::src::main.c::Main::main")
+
+
+def test_create_uid_outside_repository(tmp_path: Path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    # A sibling directory sharing the repository's name as a prefix is not inside it
+    sibling = tmp_path / "repo2"
+    sibling.mkdir()
+    with pytest.raises(ValueError):
+        Function.create_uid(sibling / "main.c", "main", repo_path=repo)
+
+
+def test_extract_single_file_uids(dummy_c_file: Path):
+    functions = CExtractor().extract(dummy_c_file, repo_path=dummy_c_file)
+    assert [f.uid for f in functions] == ["test.c::test"]
+
+
+@pytest.fixture
+def duplicate_c_file(tmp_path: Path) -> Path:
+    """
+    Provides a C file with a non-ASCII comment and two identical definitions.
+    """
+    file_path = tmp_path / "dup.c"
+    file_path.write_text(
+        "/* héllo */\n"
+        "int first() { return 0; }\n"
+        "int twice() { return 2; }\n"
+        "int twice() { return 2; }\n",
+        encoding="utf-8",
+    )
+    return file_path
+
+
+def test_write_back_session_replaces_spans(duplicate_c_file: Path):
+    first, _, second_twice = CExtractor().extract(duplicate_c_file)
+    with WriteBackSession() as session:
+        first.with_definition("int first() { return 100; }", session=session)
+        second_twice.with_definition("int twice() { return 22; }", session=session)
+    assert (
+        duplicate_c_file.read_bytes()
+        == (
+            "/* héllo */\n"
+            "int first() { return 100; }\n"
+            "int twice() { return 2; }\n"
+            "int twice() { return 22; }\n"
+        ).encode()
+    )
+
+
+def test_write_back_without_session_replaces_spans(duplicate_c_file: Path):
+    first, _, second_twice = CExtractor().extract(duplicate_c_file)
+    first.with_definition("int first() { return 100; }")
+    # The second definition moved when the first was rewritten
+    second_twice.with_definition("int twice() { return 22; }")
+    assert (
+        duplicate_c_file.read_bytes()
+        == (
+            "/* héllo */\n"
+            "int first() { return 100; }\n"
+            "int twice() { return 2; }\n"
+            "int twice() { return 22; }\n"
+        ).encode()
+    )
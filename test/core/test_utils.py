@@ -0,0 +1,216 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from tree_sitter import Parser, QueryCursor
+
+from codablellm.core import utils
+from codablellm.languages.c import CExtractor
+
+
+def test_is_binary(tmp_path: Path):
+    text_file = tmp_path / "notes.txt"
+    # Text that happens to start with an executable magic number is still text
+    text_file.write_text("MZ is the signature of DOS executables")
+    binary_file = tmp_path / "a.out"
+    binary_file.write_bytes(b"\x7fELF\x02\x01\x01\x00")
+    assert not utils.is_binary(text_file)
+    assert utils.is_binary(binary_file)
+    assert not utils.is_binary(tmp_path)
+    assert not utils.is_binary(tmp_path / "missing")
+
+
+C_SOURCE = (
+    "int add(int a, int b) {\n"
+    "    return a + b;\n"
+    "}\n"
+    "int sub(int a, int b) {\n"
+    "    return a - b;\n"
+    "}\n"
+)
+
+
+def _c_parser() -> Parser:
+    return utils.get_parser(CExtractor.LANGUAGE)
+
+
+def test_match_and_edit_changes_lengths():
+    editor = utils.ASTEditor(_c_parser(), C_SOURCE)
+    editor.match_and_edit(
+        "(function_declarator declarator: (identifier) @name)"
+        "(parameter_declaration declarator: (identifier) @param)",
+        {
+            "name": lambda n: "renamed_" + n.text.decode(),
+            "param": lambda n: "x" if n.text == b"a" else "second_argument",
+        },
+    )
+    # Every edit was recorded against the original offsets before a single re-parse
+    assert editor.source_code == (
+        "int renamed_add(int x, int second_argument) {\n"
+        "    return a + b;\n"
+        "}\n"
+        "int renamed_sub(int x, int second_argument) {\n"
+        "    return a - b;\n"
+        "}\n"
+    )
+    # The incrementally re-parsed AST matches a fresh parse of the edited code
+    fresh_ast = _c_parser().parse(editor.source_code.encode())
+    assert str(editor.ast.root_node) == str(fresh_ast.root_node)
+
+
+def test_match_and_edit_multiline_and_nested_edits():
+    editor = utils.ASTEditor(_c_parser(), C_SOURCE)
+    editor.match_and_edit(
+        "(function_definition body: (compound_statement) @body)"
+        "(return_statement) @return",
+        {"body": "{\n    int c = 0;\n\n    return c;\n}", "return": "return 1;"},
+    )
+    # Return statements are nested in the replaced bodies, so they are skipped
+    assert editor.source_code == (
+        "int add(int a, int b) {\n    int c = 0;\n\n    return c;\n}\n"
+        "int sub(int a, int b) {\n    int c = 0;\n\n    return c;\n}\n"
+    )
+    fresh_ast = _c_parser().parse(editor.source_code.encode())
+    assert str(editor.ast.root_node) == str(fresh_ast.root_node)
+    assert editor.ast.root_node.end_point == fresh_ast.root_node.end_point
+
+
+def test_edit_code_updates_ast_after_each_edit():
+    editor = utils.ASTEditor(_c_parser(), C_SOURCE)
+    for _ in range(2):
+        # Nodes are looked up again, since each edit re-parses the source code
+        node, *_ = QueryCursor(
+            utils.compile_query(CExtractor.LANGUAGE, "(identifier) @id")
+        ).captures(editor.ast.root_node)["id"]
+        editor.edit_code(node, f"{node.text.decode()}_and_more")
+    assert editor.source_code.startswith("int add_and_more_and_more(int a, int b)")
+
+
+def test_edit_code_raises_on_parsing_error():
+    editor = utils.ASTEditor(_c_parser(), C_SOURCE)
+    body = editor.ast.root_node.children[0].child_by_field_name("body")
+    with pytest.raises(utils.TSParsingError):
+        editor.edit_code(body, "{ return ; ; }}")
+
+
+def test_replace_symbols_matches_whole_words():
+    assembly = "call foo\ncall foobar\nlea rax, [_foo]\nmov foo.1, foo"
+    assert utils.replace_symbols(
+        assembly, {"foo": "sub_00000001", "foobar": "sub_00000002"}
+    ) == (
+        "call sub_00000001\ncall sub_00000002\nlea rax, [_foo]\n"
+        "mov sub_00000001.1, sub_00000001"
+    )
+    assert utils.replace_symbols(assembly, {}) == assembly
+
+
+def test_submit_bounded_caps_in_flight_futures():
+    max_pending = 3
+    num_in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def work(item: int) -> int:
+        time.sleep(0.001 * (item % 4))
+        if item % 5 == 0:
+            raise ValueError(f"Task {item} failed")
+        return item * 2
+
+    def submit(item: int) -> Future:
+        nonlocal num_in_flight, max_in_flight
+        with lock:
+            num_in_flight += 1
+            max_in_flight = max(max_in_flight, num_in_flight)
+        return executor.submit(work, item)
+
+    results = []
+    failures = []
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for future in utils.submit_bounded(submit, range(50), max_pending):
+            # A future is only yielded once it is done
+            assert future.done()
+            with lock:
+                num_in_flight -= 1
+            if future.exception():
+                failures.append(future.exception())
+            else:
+                results.append(future.result())
+    assert max_in_flight == max_pending
+    assert sorted(results) == [i * 2 for i in range(50) if i % 5]
+    assert len(failures) == 10
+
+
+def test_submit_bounded_rejects_invalid_cap():
+    with pytest.raises(ValueError):
+        list(utils.submit_bounded(lambda item: item, [1], 0))
+
+
+def test_get_max_pending():
+    assert utils.get_max_pending(4) == 8
+    assert utils.get_max_pending(None) >= 2
+
+
+class _Entry:
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def to_json(self) -> Dict[str, int]:
+        return {"value": self.value}
+
+
+def test_load_checkpoint_data_ignores_legacy_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(utils, "_get_temp_dir", lambda: tmp_path)
+    # Checkpoints written before they were append-only hold a single JSON array
+    legacy_file = tmp_path / "test_checkpoint_1.json"
+    legacy_file.write_text('[{"value": -1}]')
+    utils.save_checkpoint_file("test_checkpoint", [_Entry(0), _Entry(1)])
+    utils.save_checkpoint_file("test_checkpoint", [_Entry(2)])
+    assert utils.get_checkpoint_files("test_checkpoint") == [
+        utils.get_checkpoint_file("test_checkpoint")
+    ]
+    assert utils.load_checkpoint_data("test_checkpoint", delete_on_load=True) == [
+        {"value": 0},
+        {"value": 1},
+        {"value": 2},
+    ]
+    assert not utils.get_checkpoint_file("test_checkpoint").exists()
+    assert legacy_file.exists()
+
+
+def test_get_dask_cluster_preloads_restarted_workers(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    from distributed import Client
+
+    marker = tmp_path / "imports.log"
+    module = tmp_path / "preloaded.py"
+    module.write_text(
+        f"with open({str(marker)!r}, 'a') as f:\n"
+        "    f.write('imported\\n')\n"
+        "SYMBOL = 1\n"
+    )
+    monkeypatch.setattr(utils, "_dask_clusters", {})
+    monkeypatch.setattr(utils, "_worker_preloads", [lambda: [(module, "SYMBOL")]])
+    with ThreadPoolExecutor(4) as executor:
+        clusters = list(executor.map(lambda _: utils.get_dask_cluster(1), range(4)))
+    cluster = clusters[0]
+    try:
+        # Concurrent callers share a single cluster
+        assert all(c is cluster for c in clusters)
+        assert utils.get_dask_cluster(1) is cluster
+        assert marker.read_text().splitlines() == ["imported"]
+        with Client(cluster) as client:
+            client.restart()
+        # Restarted workers import the preloaded symbols again
+        deadline = time.monotonic() + 30
+        while len(marker.read_text().splitlines()) < 2 and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert marker.read_text().splitlines() == ["imported", "imported"]
+    finally:
+        cluster.close()
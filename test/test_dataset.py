@@ -0,0 +1,265 @@
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+import pandas
+import pytest
+from pandas import DataFrame
+
+from codablellm import create_source_dataset
+from codablellm.core import ExtractConfig
+from codablellm.core.function import DecompiledFunction, SourceFunction
+from codablellm.dataset import (
+    Dataset,
+    DecompiledCodeDataset,
+    MappedFunction,
+    SourceCodeDataset,
+    SourceCodeDatasetConfig,
+)
+
+
+@pytest.fixture
+def dummy_c_repo(tmp_path: Path) -> Path:
+    """
+    Provides a small C repository with functions in nested directories.
+    """
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    (repo / "main.c").write_text("int main() { return 0; }")
+    (repo / "src" / "util.c").write_text(
+        "int add(int a, int b) { return a + b; }\nint one() { return 1; }"
+    )
+    return repo
+
+
+def test_temp_append_matches_path_mode(
+    tmp_path: Path, dummy_c_repo: Path, monkeypatch: pytest.MonkeyPatch
+):
+    transform_file = tmp_path / "transform.py"
+    transform_file.write_text(
+        "def keep_name(sf):\n"
+        "    return sf.with_definition(sf.definition.replace('return', 'return  '))\n"
+    )
+    baseline = create_source_dataset(
+        dummy_c_repo,
+        config=SourceCodeDatasetConfig(
+            generation_mode="path",
+            extract_config=ExtractConfig(extract_as_repo=False),
+            log_generation_warning=False,
+        ),
+    )
+    # A relative repository path must still produce absolute function paths
+    monkeypatch.chdir(tmp_path)
+    dataset = create_source_dataset(
+        Path(dummy_c_repo.name),
+        config=SourceCodeDatasetConfig(
+            generation_mode="temp-append",
+            extract_config=ExtractConfig(
+                extract_as_repo=False, transform=(transform_file, "keep_name")
+            ),
+        ),
+    )
+    assert len(baseline) == 3
+    assert {uid: f.path for uid, f in dataset.items()} == {
+        uid: f.path for uid, f in baseline.items()
+    }
+    assert dataset.get_common_directory() == dummy_c_repo.resolve()
+    assert all("transformed_definition" in f.metadata for f in dataset.values())
+
+
+def test_get_common_directory_single_file(dummy_c_file: Path):
+    dataset = create_source_dataset(
+        dummy_c_file,
+        config=SourceCodeDatasetConfig(
+            generation_mode="path", log_generation_warning=False
+        ),
+    )
+    assert len(dataset) == 1
+    assert dataset.get_common_directory() == dummy_c_file.resolve().parent
+
+
+def test_get_common_directory_repository(dummy_c_repo: Path):
+    dataset = create_source_dataset(
+        dummy_c_repo,
+        config=SourceCodeDatasetConfig(log_generation_warning=False),
+    )
+    assert dataset.get_common_directory() == dummy_c_repo.resolve()
+    # Constructing a dataset from a single file also roots it at the file's directory
+    assert (
+        SourceCodeDataset([], root=dummy_c_repo / "main.c").get_common_directory()
+        == dummy_c_repo
+    )
+
+
+@pytest.fixture
+def source_dataset(tmp_path: Path) -> SourceCodeDataset:
+    """
+    Provides a source code dataset where only some functions have metadata.
+    """
+    file_path = tmp_path / "main.c"
+    return SourceCodeDataset(
+        [
+            SourceFunction.from_source(
+                file_path, "C", "int main() { return 0; }", "main", 0, 24
+            ),
+            SourceFunction.from_source(
+                file_path,
+                "C",
+                "int add(int a, int b) { return a + b; }",
+                "add",
+                25,
+                64,
+                metadata={"comment": "Adds two, integers"},
+            ),
+        ]
+    )
+
+
+@pytest.fixture
+def decompiled_dataset(
+    dummy_decompiled_function: DecompiledFunction, source_dataset: SourceCodeDataset
+) -> DecompiledCodeDataset:
+    """
+    Provides a decompiled code dataset mapped to several potential source functions.
+    """
+    return DecompiledCodeDataset(
+        [MappedFunction(dummy_decompiled_function, source_dataset)]
+    )
+
+
+def _write_with_pandas(df: DataFrame, path: Path) -> None:
+    # The DataFrame exports that save_as used before records were streamed
+    suffix = path.suffix
+    if suffix == ".json":
+        df.to_json(path, orient="records")
+    elif suffix == ".jsonl":
+        df.to_json(path, lines=True, orient="records")
+    elif suffix == ".csv":
+        df.to_csv(path, sep=",")
+    elif suffix == ".tsv":
+        df.to_csv(path, sep="\t")
+    elif suffix == ".xlsx":
+        # Excel cells only hold scalars, so nested cells are compared as strings
+        df.map(lambda v: str(v) if isinstance(v, dict) else v).to_excel(path)
+
+
+def _read(path: Path) -> Any:
+    suffix = path.suffix
+    if suffix == ".json":
+        return json.loads(path.read_text())
+    if suffix == ".jsonl":
+        return [json.loads(line) for line in path.read_text().splitlines()]
+    if suffix == ".xlsx":
+        return pandas.read_excel(path, dtype=str, keep_default_na=False).to_dict("list")
+    return pandas.read_csv(
+        path, sep="\t" if suffix == ".tsv" else ",", dtype=str, keep_default_na=False
+    ).to_dict("list")
+
+
+@pytest.mark.parametrize("extension", [".json", ".jsonl", ".csv", ".tsv", ".xlsx"])
+@pytest.mark.parametrize("dataset_fixture", ["source_dataset", "decompiled_dataset"])
+def test_save_as_matches_dataframe_export(
+    tmp_path: Path,
+    extension: str,
+    dataset_fixture: str,
+    request: pytest.FixtureRequest,
+):
+    if extension == ".xlsx":
+        pytest.importorskip("openpyxl")
+    dataset: Dataset = request.getfixturevalue(dataset_fixture)
+    expected_path = tmp_path / f"expected{extension}"
+    _write_with_pandas(dataset.to_df(), expected_path)
+    actual_path = tmp_path / f"actual{extension}"
+    dataset.save_as(actual_path)
+    assert _read(actual_path) == _read(expected_path)
+    index = dataset.to_df().index.name
+    if extension in (".json", ".jsonl"):
+        # The UID is the DataFrame index, which is not part of the JSON records
+        assert all(index not in r for r in _read(actual_path))
+    else:
+        assert list(_read(actual_path))[0] == index
+
+
+def test_save_as_unsupported_extension(source_dataset: SourceCodeDataset):
+    with pytest.raises(ValueError):
+        source_dataset.save_as("dataset.unsupported")
+
+
+@pytest.fixture
+def unstripped_dataset(tmp_path: Path) -> DecompiledCodeDataset:
+    """
+    Provides a decompiled code dataset whose functions call each other.
+    """
+    source_functions = SourceCodeDataset([])
+    return DecompiledCodeDataset(
+        MappedFunction(
+            DecompiledFunction(
+                uid=f"test.exe::{name}",
+                path=tmp_path / "test.exe",
+                name=name,
+                definition=f"int {name}(int a) {{ return {callee}(a) + helper(a); }}",
+                assembly=f"{name}:\ncall {callee}\ncall helper\nret",
+                architecture="x86_64",
+                address=address,
+            ),
+            source_functions,
+        )
+        for name, callee, address in (
+            ("first", "second", 0x1000),
+            ("second", "third", 0x2000),
+            ("third", "first", 0x3000),
+        )
+    )
+
+
+def test_to_stripped_dataset(unstripped_dataset: DecompiledCodeDataset):
+    stripped_dataset = unstripped_dataset.to_stripped_dataset()
+    stripped_functions = [d for d, _ in stripped_dataset.values()]
+    assert list(stripped_dataset) == list(unstripped_dataset)
+    names = [f.name for f in stripped_functions]
+    assert all(re.fullmatch(r"sub_[0-9a-f]{8}", n) for n in names)
+    assert len(set(names)) == len(names)
+    for function in stripped_functions:
+        assert function.definition.startswith(f"int {function.name}(int a)")
+        assert function.assembly.startswith(f"{function.name}:\n")
+        assert "helper" not in function.definition + function.assembly
+    # Stripping is deterministic, and stripping in worker processes gives the same
+    # functions as stripping each function on its own
+    assert stripped_functions == [
+        d for d, _ in unstripped_dataset.to_stripped_dataset().values()
+    ]
+    assert stripped_functions == [
+        d.to_stripped() for d, _ in unstripped_dataset.values()
+    ]
+
+
+def test_lookup_matches_linear_scan(tmp_path: Path, source_dataset: SourceCodeDataset):
+    main, add = source_dataset.values()
+    dataset = DecompiledCodeDataset(
+        MappedFunction(
+            DecompiledFunction(
+                uid=f"{binary}::{name}",
+                path=tmp_path / binary,
+                name=name,
+                definition=f"int {name}() {{ return 0; }}",
+                assembly=f"{name}: ret",
+                architecture="x86_64",
+                address=0x1000,
+            ),
+            SourceCodeDataset(sources),
+        )
+        for binary, name, sources in (
+            ("a.exe", "main", [main]),
+            ("b.exe", "main", [main]),
+            ("b.exe", "add", [add, main]),
+        )
+    )
+    for key in (main, main.uid, add, add.uid, "missing.c::missing"):
+        uid = key.uid if isinstance(key, SourceFunction) else key
+        expected = [m for m in dataset.values() if uid in m.source_functions]
+        assert dataset.lookup(key) == expected
+    assert len(dataset.lookup(main)) == 3
+    # Callers may modify the returned list without affecting later lookups
+    dataset.lookup(main).clear()
+    assert len(dataset.lookup(main)) == 3